@@ -3,6 +3,9 @@ from datetime import datetime, timezone, timedelta
 from jose import JWTError, jwt
 
 from .config import SECRET_KEY, ALGORITHM, ADMIN_ACCESS_TOKEN_EXPIRE_MINUTES
+from .token_cache import TokenCache
+
+admin_token_cache = TokenCache()
 
 
 def create_admin_access_token(admin_id: int, store_id: int) -> str:
@@ -18,13 +21,19 @@ def create_admin_access_token(admin_id: int, store_id: int) -> str:
 
 
 def decode_admin_token(token: str) -> dict | None:
-    """Decode admin JWT. Returns dict with admin_id, store_id, role or None if invalid."""
+    """Decode admin JWT. Returns dict with admin_id, store_id, role or None if invalid. Verified tokens are cached until exp."""
+    cached = admin_token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
     try:
         data = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return {
+        claims = {
             "admin_id": int(data["admin_id"]),
             "store_id": data.get("store_id"),
             "role": data.get("role"),
         }
     except (JWTError, KeyError, TypeError, ValueError):
         return None
+    admin_token_cache.put(token, data.get("exp"), claims)
+    return dict(claims)
+
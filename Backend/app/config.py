@@ -6,6 +6,8 @@ if "sqlite+aiosqlite" in DATABASE_URL:
     DATABASE_URL = DATABASE_URL.replace("sqlite+aiosqlite", "sqlite")
 
 SESSION_HEADER = "X-Session-Id"
+GUEST_CART_HEADER = "X-Guest-Cart"
+GUEST_CART_TTL_SECONDS = int(os.getenv("GUEST_CART_TTL_SECONDS", str(7 * 24 * 3600)))
 
 SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production-use-openssl-rand-hex-32")
 ALGORITHM = "HS256"
@@ -16,3 +18,44 @@ ADMIN_ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ADMIN_ACCESS_TOKEN_EXPIRE_MIN
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 STRIPE_PUBLISHABLE_KEY = os.getenv("STRIPE_PUBLISHABLE_KEY", "")
+
+MENU_CACHE_TTL_SECONDS = float(os.getenv("MENU_CACHE_TTL_SECONDS", "300"))
+
+MENU_BUNDLE_DIR = os.getenv("MENU_BUNDLE_DIR", "./static/menu")
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "16"))
+# bcrypt cost: fixed if BCRYPT_ROUNDS is set, otherwise calibrated at startup to BCRYPT_TARGET_MS.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "0")) or None
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "14"))
+
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+# Login token buckets: burst size and sustained attempts per minute, per email/store and per client IP.
+LOGIN_THROTTLE_ACCOUNT_BURST = int(os.getenv("LOGIN_THROTTLE_ACCOUNT_BURST", "5"))
+LOGIN_THROTTLE_ACCOUNT_PER_MINUTE = float(os.getenv("LOGIN_THROTTLE_ACCOUNT_PER_MINUTE", "5"))
+LOGIN_THROTTLE_CLIENT_BURST = int(os.getenv("LOGIN_THROTTLE_CLIENT_BURST", "20"))
+LOGIN_THROTTLE_CLIENT_PER_MINUTE = float(os.getenv("LOGIN_THROTTLE_CLIENT_PER_MINUTE", "30"))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+# Behind a reverse proxy set the header it writes the client address to (e.g. X-Forwarded-For) and
+# how many proxies append to it; unset, the per-client bucket keys on the direct peer address.
+LOGIN_THROTTLE_CLIENT_IP_HEADER = os.getenv("LOGIN_THROTTLE_CLIENT_IP_HEADER", "").strip()
+LOGIN_THROTTLE_TRUSTED_PROXY_HOPS = int(os.getenv("LOGIN_THROTTLE_TRUSTED_PROXY_HOPS", "1"))
+
+CART_SNAPSHOT_CACHE_SIZE = int(os.getenv("CART_SNAPSHOT_CACHE_SIZE", "10000"))
+CART_SNAPSHOT_TTL_SECONDS = float(os.getenv("CART_SNAPSHOT_TTL_SECONDS", "3600"))
+
+# Abandoned-cart sweeper: carts untouched for CART_ABANDON_AFTER_HOURS are deleted in chunks.
+CART_ABANDON_AFTER_HOURS = float(os.getenv("CART_ABANDON_AFTER_HOURS", "72"))
+CART_SWEEP_INTERVAL_SECONDS = float(os.getenv("CART_SWEEP_INTERVAL_SECONDS", "3600"))  # 0 disables
+CART_SWEEP_CHUNK_SIZE = int(os.getenv("CART_SWEEP_CHUNK_SIZE", "500"))
+# The same sweeper deletes checkout Idempotency-Key records older than this (retries past it create a new order).
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
+# order_items backfill for orders created before the table existed (run at startup, chunked).
+ORDER_ITEMS_BACKFILL_CHUNK_SIZE = int(os.getenv("ORDER_ITEMS_BACKFILL_CHUNK_SIZE", "500"))
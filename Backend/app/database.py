@@ -1,6 +1,8 @@
 """Database engine, session, and base."""
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from .config import DATABASE_URL
 
 
@@ -17,14 +19,90 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+class _SessionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.sessions_opened = 0
+        self.sessions_connected = 0
+        self.pool_checkouts = 0
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "sessions_opened": self.sessions_opened,
+                "sessions_connected": self.sessions_connected,
+                "pool_checkouts": self.pool_checkouts,
+            }
+
+
+session_stats = _SessionStats()
+
+
+@event.listens_for(engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    session_stats.incr("pool_checkouts")
+
+
+@event.listens_for(SessionLocal, "after_begin")
+def _mark_connected(session, transaction, connection):
+    session.info["connected"] = True
+
+
+class LazySession:
+    """
+    Stand-in for a Session that builds the real one on first attribute access.
+    Requests answered from caches never create a Session nor check out a pooled connection.
+    """
+
+    def __init__(self):
+        self._session: Session | None = None
+
+    @property
+    def opened(self) -> bool:
+        return self._session is not None
+
+    @property
+    def connected(self) -> bool:
+        """Whether this request checked out a connection (the session began a transaction)."""
+        return self._session is not None and bool(self._session.info.get("connected"))
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = SessionLocal()
+            session_stats.incr("sessions_opened")
+        return getattr(self._session, name)
+
+    def close(self) -> None:
+        if self._session is not None:
+            if self.connected:
+                session_stats.incr("sessions_connected")
+            self._session.close()
+
+
 def get_db():
-    db = SessionLocal()
+    session_stats.incr("requests")
+    db = LazySession()
     try:
         yield db
     finally:
         db.close()
 
 
+def _add_column_if_missing(conn, table: str, column: str, constraints: str = "") -> bool:
+    """ALTER TABLE ... ADD COLUMN for a model column the existing table lacks. Returns True if added."""
+    if column in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return False
+    column_type = Base.metadata.tables[table].c[column].type.compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type} {constraints}".rstrip()))
+    return True
+
+
 def init_db():
     """Create all tables and add any missing columns."""
     from . import models
@@ -143,3 +221,39 @@ def init_db():
                     ) WHERE store_id IS NULL
                 """))
                 conn.commit()
+
+    # Columns added after the baseline schema, on SQLite and other databases alike: the column type
+    # is compiled from the model for the connected dialect, so lengths always match the model.
+    from .models.store import normalize_store_name
+    with engine.begin() as conn:
+        _add_column_if_missing(conn, "toppings", "price", "NOT NULL DEFAULT 0.0")
+        for table, column, source in (
+            ("stores", "name_normalized", "name"),
+            ("locations", "store_name_normalized", "store_name"),
+        ):
+            if _add_column_if_missing(conn, table, column):
+                rows = conn.execute(text(f"SELECT id, {source} FROM {table}")).all()
+                if rows:
+                    conn.execute(
+                        text(f"UPDATE {table} SET {column} = :normalized WHERE id = :id"),
+                        [{"id": row[0], "normalized": normalize_store_name(row[1])} for row in rows],
+                    )
+        _add_column_if_missing(conn, "cart", "version", "NOT NULL DEFAULT 0")
+        if _add_column_if_missing(conn, "cart", "updated_at"):
+            conn.execute(text("UPDATE cart SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)"))
+        # Lines added before line_key existed keep NULL and simply never merge.
+        if _add_column_if_missing(conn, "cart_items", "line_key"):
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_cart_items_cart_line ON cart_items (cart_id, line_key)"
+            ))
+
+    # create_all does not add indexes to tables that already exist; create any that are missing
+    # (after the column migrations above, so indexes on added columns can be built).
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+    from .services.product_search import init_product_search
+    with engine.connect() as conn:
+        init_product_search(conn)
@@ -8,6 +8,14 @@ from .config import SESSION_HEADER
 from .models import User, Admin
 from .services.auth_service import decode_access_token
 from .auth import decode_admin_token
+from .principal_cache import (
+    UserPrincipal,
+    AdminPrincipal,
+    user_principals,
+    admin_principals,
+    cache_user,
+    cache_admin,
+)
 
 security = HTTPBearer(auto_error=False)
 
@@ -18,47 +26,84 @@ def get_session_id(x_session_id: Annotated[str | None, Header(alias=SESSION_HEAD
     return x_session_id.strip()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+def _user_id_from_credentials(credentials: HTTPAuthorizationCredentials | None) -> int:
     if not credentials:
         raise HTTPException(status_code=401, detail="Authorization Bearer token required")
-    token = credentials.credentials
-    user_id = decode_access_token(token)
+    user_id = decode_access_token(credentials.credentials)
     if user_id is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return user_id
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: Session = Depends(get_db),
+) -> UserPrincipal:
+    """Authenticated user snapshot. Served from the principal cache while warm (no DB lookup)."""
+    user_id = _user_id_from_credentials(credentials)
+    principal = user_principals.get(str(user_id))
+    if principal is not None:
+        return principal
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    return user
+    return cache_user(user)
 
 
-def get_current_admin(
+def get_current_user_row(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
     db: Session = Depends(get_db),
-) -> Admin:
-    """Get current admin from JWT token. Returns Admin with role and store_id."""
+) -> User:
+    """Authenticated User ORM row, for handlers that modify it (call invalidate_user after commit)."""
+    user_id = _user_id_from_credentials(credentials)
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+def _admin_token_data(credentials: HTTPAuthorizationCredentials | None) -> dict:
     if not credentials:
         raise HTTPException(status_code=401, detail="Authorization Bearer token required")
-    token = credentials.credentials
-    token_data = decode_admin_token(token)
+    token_data = decode_admin_token(credentials.credentials)
     if token_data is None:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    
-    admin_id = token_data.get("admin_id")
-    admin = db.query(Admin).filter(Admin.id == admin_id).first()
+    return token_data
+
+
+def _check_admin(admin: Admin | AdminPrincipal | None, token_data: dict) -> None:
     if not admin:
         raise HTTPException(status_code=401, detail="Admin not found")
     if not admin.is_active:
         raise HTTPException(status_code=403, detail="Admin account is inactive")
-    
-    
     if token_data.get("role") != "admin":
         raise HTTPException(status_code=401, detail="Token role mismatch")
     if admin.store_id != token_data.get("store_id"):
         raise HTTPException(status_code=401, detail="Token store_id mismatch")
-    
-    return admin
 
 
+def get_current_admin(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: Session = Depends(get_db),
+) -> AdminPrincipal:
+    """Get current admin from JWT token. Returns an admin snapshot with role and store_id (principal cache while warm)."""
+    token_data = _admin_token_data(credentials)
+    admin_id = token_data.get("admin_id")
+    principal = admin_principals.get(str(admin_id))
+    if principal is None:
+        admin = db.query(Admin).filter(Admin.id == admin_id).first()
+        _check_admin(admin, token_data)
+        principal = cache_admin(admin)
+    _check_admin(principal, token_data)
+    return principal
+
+
+def get_current_admin_row(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+    db: Session = Depends(get_db),
+) -> Admin:
+    """Current Admin ORM row, for handlers that modify it (call invalidate_admin after commit)."""
+    token_data = _admin_token_data(credentials)
+    admin = db.query(Admin).filter(Admin.id == token_data.get("admin_id")).first()
+    _check_admin(admin, token_data)
+    return admin
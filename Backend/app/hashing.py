@@ -0,0 +1,145 @@
+"""
+Dedicated, bounded process pool for bcrypt work.
+
+All password hashing/verification runs here instead of FastAPI's shared threadpool, so a login
+burst cannot starve menu/cart requests of threads or GIL time. At most
+PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_DEPTH jobs are admitted at once; beyond that
+callers get PasswordHasherBusy immediately (mapped to 503 in main).
+
+The work factor is BCRYPT_ROUNDS when set, else calibrated at startup: one hash at
+BCRYPT_MIN_ROUNDS is timed in a worker and the highest cost whose projected time (each round
+doubles it) fits BCRYPT_TARGET_MS is used. Logins rehash stored hashes of another cost.
+
+Kept free of app imports besides config: spawned workers import this module.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from .config import (
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    BCRYPT_ROUNDS,
+    BCRYPT_TARGET_MS,
+    BCRYPT_MIN_ROUNDS,
+    BCRYPT_MAX_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the bcrypt queue is full; callers should retry later."""
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:72]
+
+
+def _hash_job(password: str, rounds: int) -> tuple[str, float, float]:
+    started = time.time()
+    hashed = bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+    return hashed, started, time.time() - started
+
+
+def _verify_job(password: str, hashed: str) -> tuple[bool, float, float]:
+    started = time.time()
+    ok = bcrypt.checkpw(_encode(password), hashed.encode("utf-8"))
+    return ok, started, time.time() - started
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_depth: int = PASSWORD_HASH_QUEUE_DEPTH):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.rounds = BCRYPT_ROUNDS or 12
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn, not fork: the server process is multi-threaded.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Password hashing is saturated, retry shortly")
+        try:
+            submitted = time.time()
+            result, started, hash_seconds = self._pool().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+        wait_seconds = max(0.0, started - submitted)
+        with self._lock:
+            self.completed += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+            self.hash_seconds_total += hash_seconds
+            self.hash_seconds_max = max(self.hash_seconds_max, hash_seconds)
+        return result
+
+    def hash(self, password: str, rounds: int | None = None) -> str:
+        return self._run(_hash_job, password, rounds or self.rounds)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return self._run(_verify_job, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if hashed ($2b$<cost>$...) was made with a cost other than the current one."""
+        try:
+            return int(hashed.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def calibrate(self, target_ms: float = BCRYPT_TARGET_MS) -> int:
+        """Pick the work factor for this host (no-op when BCRYPT_ROUNDS is configured)."""
+        if BCRYPT_ROUNDS:
+            self.rounds = BCRYPT_ROUNDS
+            return self.rounds
+        _, _, seconds = self._pool().submit(_hash_job, "calibration", BCRYPT_MIN_ROUNDS).result()
+        rounds = BCRYPT_MIN_ROUNDS
+        while rounds < BCRYPT_MAX_ROUNDS and seconds * 2 * 1000 <= target_ms:
+            rounds += 1
+            seconds *= 2
+        self.rounds = rounds
+        return rounds
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            n = self.completed or 1
+            return {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_avg_ms": round(self.wait_seconds_total / n * 1000, 2),
+                "queue_wait_max_ms": round(self.wait_seconds_max * 1000, 2),
+                "hash_avg_ms": round(self.hash_seconds_total / n * 1000, 2),
+                "hash_max_ms": round(self.hash_seconds_max * 1000, 2),
+            }
+
+
+password_hasher = PasswordHasher()
@@ -1,24 +1,43 @@
-"""FastAPI app: CORS, lifespan for init DB + seed, routers."""
+"""FastAPI app: CORS, lifespan for init DB + bcrypt calibration + seed + menu bundle + cart sweeper + order_items backfill, routers."""
+import asyncio
+import math
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import init_db, SessionLocal
+from .database import init_db, SessionLocal, session_stats
+from .hashing import password_hasher, PasswordHasherBusy
+from .throttle import login_throttle, LoginThrottled
 from .services import seed_if_empty, seed_locations_if_empty, seed_stores_from_locations
+from .services.menu_bundle import build_menu_bundle
+from .services.recommendations import recommender
+from .services.cart_sweeper import cart_sweeper
+from .services.order_items import run_order_items_backfill
 from .routers import menu_router, auth_router, cart_router, orders_router, locations_router, admin_router, payments_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    password_hasher.calibrate()
     db = SessionLocal()
     try:
         seed_if_empty(db)
         seed_locations_if_empty(db)
         seed_stores_from_locations(db)
+        build_menu_bundle(db)
+        recommender.rebuild(db)
     finally:
         db.close()
+    sweeper = asyncio.create_task(cart_sweeper.run_forever()) if cart_sweeper.interval_seconds > 0 else None
+    backfill = asyncio.create_task(asyncio.to_thread(run_order_items_backfill))
     yield
+    if sweeper is not None:
+        sweeper.cancel()
+    # A failed backfill (e.g. database locked) is retried at the next startup; reads fall back to order_data.
+    await asyncio.gather(backfill, return_exceptions=True)
+    password_hasher.shutdown()
 
 
 app = FastAPI(title="Pizza API", lifespan=lifespan)
@@ -40,6 +59,17 @@ app.include_router(admin_router)
 app.include_router(payments_router)
 
 
+@app.exception_handler(PasswordHasherBusy)
+def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+@app.exception_handler(LoginThrottled)
+def login_throttled(request: Request, exc: LoginThrottled):
+    retry_after = max(1, math.ceil(min(exc.retry_after, 3600)))
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": str(retry_after)})
+
+
 @app.get("/")
 def root():
     return {"message": "Pizza API", "docs": "/docs"}
@@ -48,3 +78,27 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/health/password-hashing")
+def password_hashing_stats():
+    """bcrypt pool metrics: queue wait vs hash time, completed and rejected jobs."""
+    return password_hasher.stats()
+
+
+@app.get("/health/login-throttle")
+def login_throttle_stats():
+    """Login token-bucket counters: attempts allowed vs shed before bcrypt."""
+    return login_throttle.stats()
+
+
+@app.get("/health/db-sessions")
+def db_session_stats():
+    """Requests that declared a DB session vs sessions actually opened/connected and pool checkouts."""
+    return session_stats.snapshot()
+
+
+@app.get("/health/cart-sweeper")
+def cart_sweeper_stats():
+    """Abandoned-cart sweeper: runs, rows reclaimed in total and by the last run."""
+    return cart_sweeper.stats()
@@ -6,9 +6,12 @@ from .user import User
 from .cart import Cart
 from .cart_item import CartItem
 from .order import Order
+from .order_item import OrderItem
 from .location import Location
 from .store import Store
 from .admin import Admin
+from .store_product import StoreProduct
+from .idempotency_key import IdempotencyKey
 
 __all__ = [
     "Category",
@@ -19,7 +22,10 @@ __all__ = [
     "Cart",
     "CartItem",
     "Order",
+    "OrderItem",
     "Location",
     "Store",
     "Admin",
+    "StoreProduct",
+    "IdempotencyKey",
 ]
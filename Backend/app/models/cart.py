@@ -11,7 +11,9 @@ class Cart(Base):
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(100), nullable=True, unique=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, unique=True, index=True)
+    version = Column(Integer, default=0, server_default="0", nullable=False)  # bumped by every cart mutation
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # abandoned-cart sweeper
 
     user = relationship("User", backref="carts")
     items = relationship("CartItem", back_populates="cart", cascade="all, delete-orphan")
@@ -1,11 +1,15 @@
 """Cart item: product or custom pizza with optional custom_data JSON."""
-from sqlalchemy import Column, Integer, Float, ForeignKey, String, JSON
+from sqlalchemy import Column, Integer, Float, ForeignKey, String, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # Identical lines merge: (cart_id, line_key) is the upsert conflict target.
+        UniqueConstraint("cart_id", "line_key", name="uq_cart_items_cart_line"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     cart_id = Column(Integer, ForeignKey("cart.id", ondelete="CASCADE"), nullable=False)
@@ -13,6 +17,7 @@ class CartItem(Base):
     quantity = Column(Integer, default=1, nullable=False)
     unit_price = Column(Float, default=0.0, nullable=False)
     custom_data = Column(JSON, nullable=True)  
+    line_key = Column(String(64), nullable=True)  # sha256 of product_id + canonical custom_data
 
     cart = relationship("Cart", back_populates="items")
     product = relationship("Product")
@@ -0,0 +1,16 @@
+"""Idempotency-Key records for checkout: one row per (user, key) holding the original response."""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("user_id", "key", name="uq_idempotency_user_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    key = Column(String(255), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="SET NULL"), nullable=True)
+    response = Column(JSON, nullable=True)  # CheckoutOut as returned the first time (written with the order)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)  # expiry sweep
@@ -1,7 +1,8 @@
 """Store location model for Find Location feature. Linked to Store for orders."""
 from sqlalchemy import Column, Integer, String, Float, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from ..database import Base
+from .store import normalize_store_name
 
 
 class Location(Base):
@@ -10,6 +11,7 @@ class Location(Base):
     id = Column(Integer, primary_key=True, index=True)
     store_id = Column(Integer, ForeignKey("stores.id", ondelete="SET NULL"), nullable=True, index=True)
     store_name = Column(String(200), nullable=False)
+    store_name_normalized = Column(String(200), nullable=True, index=True)  # normalize_store_name(store_name), set on write
     address = Column(String(500), nullable=False)
     area = Column(String(100), nullable=True)
     city = Column(String(100), nullable=False)
@@ -20,3 +22,8 @@ class Location(Base):
     closing_time = Column(String(10), nullable=True)
 
     store = relationship("Store", backref="locations")
+
+    @validates("store_name")
+    def _set_store_name_normalized(self, key, value):
+        self.store_name_normalized = normalize_store_name(value)
+        return value
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -6,6 +6,12 @@ from ..database import Base
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Order history (user) and store dashboards (store, optional status) list newest first.
+        Index("ix_orders_user_created", "user_id", "created_at"),
+        Index("ix_orders_store_created", "store_id", "created_at"),
+        Index("ix_orders_store_status_created", "store_id", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String(100), nullable=True, index=True)
@@ -25,3 +31,6 @@ class Order(Base):
 
     user = relationship("User", backref="orders")
     store = relationship("Store", back_populates="orders")
+    items = relationship(
+        "OrderItem", back_populates="order", order_by="OrderItem.position", cascade="all, delete-orphan"
+    )
@@ -0,0 +1,26 @@
+"""Order line: one row per item of an order, written at checkout next to the order_data JSON."""
+from sqlalchemy import Column, Integer, Float, String, JSON, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+    __table_args__ = (
+        # Lines of an order in checkout order (also keeps a re-run backfill from duplicating lines);
+        # product index serves per-product aggregates (top sellers, item counts).
+        UniqueConstraint("order_id", "position", name="uq_order_items_order_position"),
+        Index("ix_order_items_product", "product_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, default=0, nullable=False)  # index of the line in order_data["items"]
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="SET NULL"), nullable=True)
+    name = Column(String(255), nullable=False)
+    quantity = Column(Integer, default=1, nullable=False)
+    unit_price = Column(Float, default=0.0, nullable=False)
+    custom_data = Column(JSON, nullable=True)
+
+    order = relationship("Order", back_populates="items")
+    product = relationship("Product")
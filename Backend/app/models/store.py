@@ -1,15 +1,25 @@
 """Store model for admin management."""
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from ..database import Base
 
 
+def normalize_store_name(name: str | None) -> str:
+    """Normalize store name for matching: remove extra spaces, normalize dash spacing, uppercase."""
+    if not name:
+        return ""
+    normalized = ' '.join(name.strip().upper().split())
+    normalized = normalized.replace(' - ', '-').replace(' -', '-').replace('- ', '-')
+    return normalized
+
+
 class Store(Base):
     __tablename__ = "stores"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
+    name_normalized = Column(String(255), nullable=True, index=True)  # normalize_store_name(name), set on write
     address = Column(String(500), nullable=True)
     city = Column(String(100), nullable=True)
     state = Column(String(100), nullable=True)
@@ -20,3 +30,8 @@ class Store(Base):
 
     admins = relationship("Admin", back_populates="store")
     orders = relationship("Order", back_populates="store")
+
+    @validates("name")
+    def _set_name_normalized(self, key, value):
+        self.name_normalized = normalize_store_name(value)
+        return value
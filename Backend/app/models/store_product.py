@@ -0,0 +1,18 @@
+"""Per-store menu overrides: availability (sold out) and price override for a product."""
+from sqlalchemy import Column, Integer, Float, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+
+class StoreProduct(Base):
+    __tablename__ = "store_products"
+    __table_args__ = (UniqueConstraint("store_id", "product_id", name="uq_store_product"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    store_id = Column(Integer, ForeignKey("stores.id", ondelete="CASCADE"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    is_available = Column(Boolean, default=True, nullable=False)
+    price_override = Column(Float, nullable=True)
+
+    store = relationship("Store")
+    product = relationship("Product")
@@ -1,5 +1,5 @@
 """Topping model for customization options (crusts, sauces, cheese, meats, veggies)."""
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Float
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -10,5 +10,6 @@ class Topping(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     type = Column(String(50), nullable=False)  
+    price = Column(Float, default=0.0, nullable=False)
 
     pizza_toppings = relationship("PizzaTopping", back_populates="topping")
@@ -0,0 +1,84 @@
+"""
+Short-TTL cache of authenticated principals (the User/Admin fields auth dependencies need).
+
+get_current_user/get_current_admin return these snapshots instead of ORM rows, so authenticated
+reads skip the users/admins lookup while warm. Handlers that modify the row load it with
+get_current_user_row/get_current_admin_row and must invalidate afterwards; changing a store's
+status invalidates all of its admins.
+"""
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from .config import PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_SIZE
+from .models import User, Admin
+from .token_cache import TokenCache
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    id: int
+    name: str
+    email: str
+    phone: str | None
+
+    @classmethod
+    def from_row(cls, user: User) -> "UserPrincipal":
+        return cls(id=user.id, name=user.name, email=user.email, phone=user.phone)
+
+
+@dataclass(frozen=True)
+class AdminPrincipal:
+    id: int
+    store_id: int | None
+    role: str
+    is_active: bool
+    is_first_login: bool
+    name: str | None
+    email: str | None
+    phone: str | None
+
+    @classmethod
+    def from_row(cls, admin: Admin) -> "AdminPrincipal":
+        return cls(
+            id=admin.id,
+            store_id=admin.store_id,
+            role=admin.role,
+            is_active=bool(admin.is_active),
+            is_first_login=bool(admin.is_first_login),
+            name=admin.name,
+            email=admin.email,
+            phone=admin.phone,
+        )
+
+
+# Same expiring LRU as the token cache, keyed by principal id with a fixed TTL instead of a JWT exp.
+user_principals = TokenCache(PRINCIPAL_CACHE_SIZE)
+admin_principals = TokenCache(PRINCIPAL_CACHE_SIZE)
+
+
+def cache_user(user: User) -> UserPrincipal:
+    principal = UserPrincipal.from_row(user)
+    user_principals.put(str(user.id), time.time() + PRINCIPAL_CACHE_TTL_SECONDS, principal)
+    return principal
+
+
+def cache_admin(admin: Admin) -> AdminPrincipal:
+    principal = AdminPrincipal.from_row(admin)
+    admin_principals.put(str(admin.id), time.time() + PRINCIPAL_CACHE_TTL_SECONDS, principal)
+    return principal
+
+
+def invalidate_user(user_id: int) -> None:
+    user_principals.evict(str(user_id))
+
+
+def invalidate_admin(admin_id: int) -> None:
+    admin_principals.evict(str(admin_id))
+
+
+def invalidate_store_admins(db: Session, store_id: int) -> None:
+    """Drop the principals of every admin of a store (e.g. after the store is deactivated)."""
+    for (admin_id,) in db.query(Admin.id).filter(Admin.store_id == store_id).all():
+        invalidate_admin(admin_id)
@@ -1,10 +1,12 @@
 """Admin routes for store-based order management."""
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
 from ..database import get_db
-from ..models import Admin, Order, Store
+from ..serialization import schema_columns, dump_models, dump_rows, json_bytes
+from ..models import Admin, Order, Store, Product, StoreProduct
 from ..schemas import (
     AdminSignupWithStoreIn,
     AdminLoginIn,
@@ -14,7 +16,6 @@ from ..schemas import (
     AdminMeOut,
     AdminMeUpdateIn,
     OrderOut,
-    OrderItemOut,
     OrderStatusUpdateIn,
     StoreCreateIn,
     StoreCreateOut,
@@ -23,13 +24,19 @@ from ..schemas import (
     ChangePasswordIn,
     AdminCompleteSetupIn,
     AdminLoginByStoreIn,
+    StoreProductOut,
+    StoreProductUpdateIn,
 )
 from ..schemas.auth import MessageOut
-from ..dependencies import get_current_admin
+from ..dependencies import get_current_admin, get_current_admin_row
+from ..principal_cache import AdminPrincipal, invalidate_admin, invalidate_store_admins
+from ..throttle import login_throttle, client_of
+from ..hashing import PasswordHasherBusy
 from ..services.admin_service import (
     get_admin_by_email,
     get_admin_by_store_id,
     verify_password,
+    password_needs_rehash,
     create_access_token,
     create_admin,
     create_store_admin_auto,
@@ -38,6 +45,7 @@ from ..services.admin_service import (
     create_store,
     link_locations_to_store,
 )
+from ..services.order_items import order_items_out
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -47,7 +55,8 @@ VALID_STATUSES = {"PENDING", "CONFIRMED", "ACCEPTED", "REJECTED", "PREPARING", "
 @router.get("/stores", response_model=list[StoreOut])
 def list_stores(db: Session = Depends(get_db)):
     """List all active stores (for admin login dropdown). No auth required."""
-    return db.query(Store).filter(Store.is_active == True).order_by(Store.name).all()
+    stmt = select(*schema_columns(Store, StoreOut)).where(Store.is_active == True).order_by(Store.name)
+    return json_bytes(dump_rows(db.execute(stmt).mappings()))
 
 
 @router.post("/stores", response_model=StoreCreateOut)
@@ -134,18 +143,8 @@ def admin_signup(body: AdminSignupWithStoreIn, db: Session = Depends(get_db)):
 
 
 def _order_to_out(order: Order) -> OrderOut:
-    """Build OrderOut with items list (product names) from order_data."""
-    items = []
-    if order.order_data and isinstance(order.order_data, dict):
-        for row in order.order_data.get("items") or []:
-            if isinstance(row, dict):
-                items.append(
-                    OrderItemOut(
-                        product_name=row.get("name", "Custom"),
-                        quantity=int(row.get("quantity", 0)),
-                        unit_price=float(row.get("unit_price", 0)),
-                    )
-                )
+    """Build OrderOut with items list (product names) from order_items; customer details from order_data."""
+    items = order_items_out(order)
     
     # Extract customer details from order_data.delivery
     customer_name = None
@@ -191,15 +190,26 @@ def _order_to_out(order: Order) -> OrderOut:
     )
 
 
+def _rehash_if_needed(db: Session, admin: Admin, password: str) -> None:
+    """Upgrade/downgrade a verified password hash to the current bcrypt cost."""
+    if not password_needs_rehash(admin.password_hash):
+        return
+    try:
+        admin.password_hash = hash_password(password)
+        db.commit()
+    except PasswordHasherBusy:
+        pass  # keep the old hash; the next login retries
+
+
 @router.post("/login", response_model=AdminAuthOut)
-def admin_login(body: AdminLoginIn, db: Session = Depends(get_db)):
+def admin_login(body: AdminLoginIn, request: Request, db: Session = Depends(get_db)):
     """
     Admin login - verifies email and password from admin database.
     Authentication happens here: checks if admin exists, is active, and password matches.
     Optionally provide store data - if provided, creates new store and links admin to it.
     Returns access_token, admin_name, store_id. JWT payload: admin_id, store_id, role=admin.
     """
-    
+    login_throttle.check("admin", body.email, client_of(request))
     admin = get_admin_by_email(db, body.email)
     if not admin:
         raise HTTPException(
@@ -219,6 +229,8 @@ def admin_login(body: AdminLoginIn, db: Session = Depends(get_db)):
             detail="Invalid email or password",
             headers={"X-Error-Type": "password"}
         )
+    login_throttle.succeeded("admin", body.email)
+    _rehash_if_needed(db, admin, body.password)
     
    
     if body.store:
@@ -246,6 +258,7 @@ def admin_login(body: AdminLoginIn, db: Session = Depends(get_db)):
             )
         db.refresh(admin)
     
+    invalidate_admin(admin.id)
     token = create_access_token(admin.id, admin.store_id)
     return AdminAuthOut(
         access_token=token,
@@ -255,11 +268,12 @@ def admin_login(body: AdminLoginIn, db: Session = Depends(get_db)):
 
 
 @router.post("/login-by-store", response_model=AdminTokenOut)
-def admin_login_by_store(body: AdminLoginByStoreIn, db: Session = Depends(get_db)):
+def admin_login_by_store(body: AdminLoginByStoreIn, request: Request, db: Session = Depends(get_db)):
     """
     Legacy: login with store_id and password. Returns first_login flag for complete-setup flow.
     If store doesn't exist, creates it from location data or minimal store.
     """
+    login_throttle.check("store", str(body.store_id), client_of(request))
     store = db.query(Store).filter(Store.id == body.store_id, Store.is_active == True).first()
     if not store:
         
@@ -279,10 +293,13 @@ def admin_login_by_store(body: AdminLoginByStoreIn, db: Session = Depends(get_db
         raise HTTPException(status_code=403, detail="Admin account is inactive")
     if not verify_password(body.password, admin.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_throttle.succeeded("store", str(body.store_id))
+    _rehash_if_needed(db, admin, body.password)
     
   
     ensure_store_exists(db, admin)
     db.refresh(admin)
+    invalidate_admin(admin.id)
     
     token = create_access_token(admin.id, admin.store_id)
     if admin.is_first_login:
@@ -296,7 +313,7 @@ def admin_login_by_store(body: AdminLoginByStoreIn, db: Session = Depends(get_db
 
 @router.get("/me", response_model=AdminMeOut)
 def get_admin_me(
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     """Get current admin profile and store details for the profile page."""
@@ -319,7 +336,7 @@ def get_admin_me(
 @router.patch("/me", response_model=MessageOut)
 def update_admin_me(
     body: AdminMeUpdateIn,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: Admin = Depends(get_current_admin_row),
     db: Session = Depends(get_db),
 ):
     """Update current admin profile and/or store details. Store isolation enforced."""
@@ -349,13 +366,16 @@ def update_admin_me(
                 store.is_active = body.store.is_active
 
     db.commit()
+    invalidate_admin(current_admin.id)
+    if body.store is not None and body.store.is_active is not None and current_admin.store_id is not None:
+        invalidate_store_admins(db, current_admin.store_id)
     return MessageOut(message="Profile updated successfully")
 
 
 @router.patch("/store", response_model=MessageOut)
 def update_store_status(
     body: StoreStatusUpdateIn,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     """Update current admin's store status (activate/deactivate). Store isolation enforced."""
@@ -368,6 +388,7 @@ def update_store_status(
     
     store.is_active = body.is_active
     db.commit()
+    invalidate_store_admins(db, store.id)
     
     status_text = "activated" if body.is_active else "deactivated"
     return MessageOut(message=f"Store {status_text} successfully")
@@ -376,20 +397,21 @@ def update_store_status(
 @router.put("/change-password", response_model=MessageOut)
 def change_password(
     body: ChangePasswordIn,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: Admin = Depends(get_current_admin_row),
     db: Session = Depends(get_db),
 ):
     """Set new password and clear first-login flag. Requires JWT."""
     current_admin.password_hash = hash_password(body.new_password)
     current_admin.is_first_login = False
     db.commit()
+    invalidate_admin(current_admin.id)
     return MessageOut(message="Password changed successfully")
 
 
 @router.put("/complete-setup", response_model=MessageOut)
 def complete_setup(
     body: AdminCompleteSetupIn,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: Admin = Depends(get_current_admin_row),
     db: Session = Depends(get_db),
 ):
     """
@@ -402,19 +424,78 @@ def complete_setup(
     current_admin.password_hash = hash_password(body.new_password)
     current_admin.is_first_login = False
     db.commit()
+    invalidate_admin(current_admin.id)
     return MessageOut(message="Setup complete. You can now use the dashboard.")
 
 
+def _store_product_out(product: Product, override: StoreProduct | None) -> StoreProductOut:
+    base_price = float(product.base_price or 0.0)
+    price_override = override.price_override if override else None
+    return StoreProductOut(
+        product_id=product.id,
+        name=product.name,
+        base_price=base_price,
+        price=price_override if price_override is not None else base_price,
+        is_available=override.is_available if override else True,
+        price_override=price_override,
+    )
+
+
+@router.get("/menu", response_model=list[StoreProductOut])
+def list_store_menu(
+    current_admin: AdminPrincipal = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Menu as resolved for the admin's store: availability and price overrides."""
+    if current_admin.store_id is None:
+        raise HTTPException(status_code=403, detail="Admin must be assigned to a store")
+    products = db.query(Product).order_by(Product.id).all()
+    overrides = {
+        o.product_id: o
+        for o in db.query(StoreProduct).filter(StoreProduct.store_id == current_admin.store_id).all()
+    }
+    return json_bytes(dump_models(StoreProductOut, [_store_product_out(p, overrides.get(p.id)) for p in products]))
+
+
+@router.patch("/menu/{product_id}", response_model=StoreProductOut)
+def update_store_product(
+    product_id: int,
+    body: StoreProductUpdateIn,
+    current_admin: AdminPrincipal = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Toggle availability (sold out) and/or set a price override for a product at the admin's store."""
+    if current_admin.store_id is None:
+        raise HTTPException(status_code=403, detail="Admin must be assigned to a store")
+    product = db.query(Product).filter(Product.id == product_id).first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    override = db.query(StoreProduct).filter(
+        StoreProduct.store_id == current_admin.store_id,
+        StoreProduct.product_id == product_id,
+    ).first()
+    if not override:
+        override = StoreProduct(store_id=current_admin.store_id, product_id=product_id, is_available=True)
+        db.add(override)
+    if body.is_available is not None:
+        override.is_available = body.is_available
+    if "price_override" in body.model_fields_set:
+        override.price_override = body.price_override
+    db.commit()
+    db.refresh(override)
+    return _store_product_out(product, override)
+
+
 @router.get("/orders", response_model=list[OrderOut])
 def list_admin_orders(
     status: str | None = Query(None, description="Filter by order status"),
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     """Get orders for the admin's store."""
     if current_admin.store_id is None:
         raise HTTPException(status_code=403, detail="Admin must be assigned to a store")
-    query = db.query(Order).filter(Order.store_id == current_admin.store_id)
+    query = db.query(Order).options(selectinload(Order.items)).filter(Order.store_id == current_admin.store_id)
     
     if status:
         status_upper = (status or "").strip().upper()
@@ -423,13 +504,13 @@ def list_admin_orders(
         query = query.filter(Order.status == status_upper)
     
     orders = query.order_by(Order.created_at.desc()).all()
-    return [_order_to_out(o) for o in orders]
+    return json_bytes(dump_models(OrderOut, [_order_to_out(o) for o in orders]))
 
 
 @router.patch("/orders/{order_id}/accept")
 def accept_order(
     order_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     """Accept an order. Sets status to accepted and accepted_at timestamp."""
@@ -458,7 +539,7 @@ def accept_order(
 @router.patch("/orders/{order_id}/reject")
 def reject_order(
     order_id: int,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     """Reject an order. Sets status to rejected and rejected_at timestamp."""
@@ -488,7 +569,7 @@ def reject_order(
 def update_order_status(
     order_id: int,
     body: OrderStatusUpdateIn,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     """Update order status. Valid transitions:
@@ -541,7 +622,7 @@ def update_order_status(
 def update_order(
     order_id: int,
     body: OrderStatusUpdateIn,
-    current_admin: Admin = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
     """
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from sqlalchemy.orm import Session
 
+from ..config import SESSION_HEADER, GUEST_CART_HEADER
 from ..database import get_db
 from ..models import User
 from ..schemas import SignupIn, LoginIn, UserOut, TokenOut, MessageOut, AuthUpdateIn
@@ -8,9 +9,15 @@ from ..services.auth_service import (
     get_user_by_email,
     create_user,
     verify_password,
+    password_needs_rehash,
+    hash_password,
     create_access_token,
 )
-from ..dependencies import get_current_user
+from ..dependencies import get_current_user, get_current_user_row
+from ..principal_cache import UserPrincipal, invalidate_user
+from ..throttle import login_throttle, client_of
+from ..hashing import PasswordHasherBusy
+from ..services.guest_cart import GuestCartError, merge_guest_cart
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -24,28 +31,50 @@ def signup(body: SignupIn, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenOut)
-def login(body: LoginIn, db: Session = Depends(get_db)):
+def login(
+    body: LoginIn,
+    request: Request,
+    db: Session = Depends(get_db),
+    session_id: str | None = Header(default=None, alias=SESSION_HEADER),
+    guest_cart: str | None = Header(default=None, alias=GUEST_CART_HEADER),
+):
+    login_throttle.check("user", body.email, client_of(request))
     user = get_user_by_email(db, body.email)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     if not verify_password(body.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    login_throttle.succeeded("user", body.email)
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(body.password)
+            db.commit()
+        except PasswordHasherBusy:
+            pass  # keep the old hash; the next login retries
+    merged = skipped = 0
+    if session_id and session_id.strip() and guest_cart:
+        try:
+            merged, skipped = merge_guest_cart(db, user.id, session_id.strip(), guest_cart)
+        except GuestCartError:
+            db.rollback()  # a stale or tampered guest cart never blocks login
     token = create_access_token(user.id)
     return TokenOut(
         access_token=token,
         user=UserOut(id=user.id, name=user.name, email=user.email, phone=user.phone),
+        merged_cart_lines=merged,
+        skipped_cart_lines=skipped,
     )
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)):
+def me(current_user: UserPrincipal = Depends(get_current_user)):
     return current_user
 
 
 @router.patch("/me", response_model=UserOut)
 def update_me(
     body: AuthUpdateIn,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_row),
     db: Session = Depends(get_db),
 ):
     if body.name is not None:
@@ -54,4 +83,5 @@ def update_me(
         current_user.phone = body.phone or None
     db.commit()
     db.refresh(current_user)
+    invalidate_user(current_user.id)
     return current_user
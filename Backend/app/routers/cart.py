@@ -1,121 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from sqlalchemy.orm import Session, joinedload
 
 from ..database import get_db
-from ..models import Cart, CartItem, Product, User
-from ..schemas import CartItemIn, CartItemOut, CartOut, CartUpdateIn
-from ..dependencies import get_current_user
+from ..models import Cart, CartItem
+from ..schemas import CartItemIn, CartItemOut, CartOut, CartUpdateIn, GuestCartOut
+from ..config import GUEST_CART_HEADER
+from ..dependencies import get_current_user, get_session_id
+from ..principal_cache import UserPrincipal
+from ..services.pricing import PricingError
+from ..services.cart_lines import (
+    UnknownProducts,
+    get_or_create_cart,
+    price_available_lines,
+    price_lines,
+    upsert_cart_line,
+    upsert_cart_lines,
+)
+from ..services.cart_snapshot import bump_cart_version, cart_etag, cart_snapshots
+from ..services.cart_view import cart_item_to_out, load_cart_out, render_cart
+from ..services.guest_cart import GuestCartError, add_guest_line, decode_guest_cart, encode_guest_cart
 
 router = APIRouter(prefix="/cart", tags=["cart"])
 
-
-def _get_or_create_cart(db: Session, user_id: int) -> Cart:
-    cart = db.query(Cart).filter(Cart.user_id == user_id).first()
-    if not cart:
-        cart = Cart(user_id=user_id, session_id=f"user_{user_id}")
-        db.add(cart)
-        db.commit()
-        db.refresh(cart)
-    return cart
-
-
-def _cart_item_to_out(item: CartItem) -> dict:
-    product_name = None
-    if item.product_id and item.product:
-        product_name = item.product.name
-    elif item.custom_data and isinstance(item.custom_data, dict):
-        product_name = item.custom_data.get("name", "Custom Pizza")
-    else:
-        product_name = "Custom Pizza"
-
-    out = {
-        "id": item.id,
-        "product_id": item.product_id,
-        "product_name": product_name,
-        "quantity": item.quantity,
-        "unit_price": item.unit_price,
-        "custom_data": item.custom_data,
-        "menu_item": None,
-    }
-    if item.product_id and item.product:
-        out["menu_item"] = {
-            "id": item.product.id,
-            "name": item.product.name,
-            "price": item.unit_price,
-            "image": item.product.image or "🍕",
-        }
-    elif item.custom_data and isinstance(item.custom_data, dict):
-        out["menu_item"] = {
-            "id": None,
-            "name": item.custom_data.get("name", "Custom Pizza"),
-            "price": item.unit_price,
-            "image": item.custom_data.get("image", "🍕"),
-        }
-    return out
+MAX_BULK_ITEMS = 50
 
 
 @router.get("", response_model=CartOut)
 def get_cart(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
 ):
-    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
+    """Cart with subtotal and line count. Served from the versioned snapshot with an ETag while unchanged."""
+    cart = db.query(Cart.id, Cart.version).filter(Cart.user_id == current_user.id).first()
     if not cart:
         return CartOut(items=[])
-    items = (
-        db.query(CartItem)
-        .filter(CartItem.cart_id == cart.id)
-        .options(joinedload(CartItem.product))
-        .all()
+    etag = cart_etag(cart.id, cart.version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    body = cart_snapshots.get_or_render(
+        cart.id, cart.version, lambda: load_cart_out(db, cart.id).model_dump_json().encode("utf-8")
     )
-    return CartOut(items=[CartItemOut(**_cart_item_to_out(i)) for i in items])
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/snapshots/stats")
+def cart_snapshot_stats():
+    """Cart snapshot cache size, hits/misses and renders."""
+    return cart_snapshots.stats()
 
 
 @router.post("/add")
 def add_to_cart(
     body: CartItemIn,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    if body.product_id is not None:
-        product = db.query(Product).filter(Product.id == body.product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-        unit_price = float(product.base_price)
-        custom_data = body.custom_data
-    else:
-        if not body.custom_data or not isinstance(body.custom_data, dict):
-            raise HTTPException(status_code=400, detail="custom_data required for custom pizza")
-        unit_price = float(body.custom_data.get("price", 0))
-        if unit_price < 0:
-            raise HTTPException(status_code=400, detail="Invalid price")
-        custom_data = body.custom_data
-
-    cart = _get_or_create_cart(db, current_user.id)
-    item = CartItem(
-        cart_id=cart.id,
-        product_id=body.product_id,
-        quantity=body.quantity,
-        unit_price=unit_price,
-        custom_data=custom_data,
-    )
-    db.add(item)
+    try:
+        (line,), products = price_lines(db, [body.model_dump()])
+    except UnknownProducts:
+        raise HTTPException(status_code=404, detail="Product not found")
+    except PricingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cart = get_or_create_cart(db, current_user.id)
+    item = upsert_cart_line(db, cart.id, **line)
+    item.product = products.get(body.product_id)
+    out = CartItemOut(**cart_item_to_out(item))
     db.commit()
-    db.refresh(item)
-    
-    item = (
-        db.query(CartItem)
-        .options(joinedload(CartItem.product))
-        .filter(CartItem.id == item.id)
-        .first()
-    )
-    return CartItemOut(**_cart_item_to_out(item))
+    return out
+
+
+@router.post("/items", response_model=CartOut)
+def add_cart_items(
+    body: list[CartItemIn],
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Add many items in one transaction (saved-cart restore, reorder). Identical lines merge."""
+    if not body:
+        raise HTTPException(status_code=400, detail="No items to add")
+    if len(body) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request")
+
+    try:
+        lines, _ = price_lines(db, [item.model_dump() for item in body])
+    except UnknownProducts as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PricingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cart_id = get_or_create_cart(db, current_user.id).id
+    upsert_cart_lines(db, cart_id, lines)
+    db.commit()
+    return load_cart_out(db, cart_id)
 
 
 @router.put("/update")
 def update_cart_item(
     body: CartUpdateIn,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
@@ -128,6 +113,7 @@ def update_cart_item(
     if not item:
         raise HTTPException(status_code=404, detail="Cart item not found")
     item.quantity = body.quantity
+    bump_cart_version(db, cart.id)
     db.commit()
     db.refresh(item)
     item = (
@@ -136,13 +122,13 @@ def update_cart_item(
         .filter(CartItem.id == item.id)
         .first()
     )
-    return CartItemOut(**_cart_item_to_out(item))
+    return CartItemOut(**cart_item_to_out(item))
 
 
 @router.delete("/remove/{item_id}")
 def remove_cart_item(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
@@ -154,18 +140,93 @@ def remove_cart_item(
     ).first()
     if item:
         db.delete(item)
+        bump_cart_version(db, cart.id)
         db.commit()
     return None
 
 
 @router.delete("/clear")
 def clear_cart(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
     if not cart:
         return
     db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
+    bump_cart_version(db, cart.id)
     db.commit()
     return None
+
+
+def _guest_lines(session_id: str, token: str | None) -> list[dict]:
+    try:
+        return decode_guest_cart(session_id, token)
+    except GuestCartError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _guest_cart_out(db: Session, session_id: str, lines: list[dict]) -> GuestCartOut:
+    """Price the guest lines server-side (dropping lines that no longer price) and re-sign them."""
+    priced, kept, products = price_available_lines(db, lines)
+    items = [
+        CartItem(id=n, product=products.get(line["product_id"]), **line)
+        for n, line in enumerate(priced, start=1)
+    ]
+    return GuestCartOut(cart_token=encode_guest_cart(session_id, kept), cart=render_cart(items))
+
+
+@router.get("/guest", response_model=GuestCartOut)
+def get_guest_cart(
+    session_id: str = Depends(get_session_id),
+    guest_cart: str | None = Header(default=None, alias=GUEST_CART_HEADER),
+    db: Session = Depends(get_db),
+):
+    """Anonymous cart carried in the signed X-Guest-Cart token (bound to X-Session-Id). No DB writes."""
+    return _guest_cart_out(db, session_id, _guest_lines(session_id, guest_cart))
+
+
+@router.post("/guest/add", response_model=GuestCartOut)
+def add_to_guest_cart(
+    body: CartItemIn,
+    session_id: str = Depends(get_session_id),
+    guest_cart: str | None = Header(default=None, alias=GUEST_CART_HEADER),
+    db: Session = Depends(get_db),
+):
+    lines = _guest_lines(session_id, guest_cart)
+    try:
+        price_lines(db, [body.model_dump()])
+        add_guest_line(lines, body.product_id, body.quantity, body.custom_data)
+    except UnknownProducts:
+        raise HTTPException(status_code=404, detail="Product not found")
+    except (PricingError, GuestCartError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _guest_cart_out(db, session_id, lines)
+
+
+@router.put("/guest/update", response_model=GuestCartOut)
+def update_guest_cart_item(
+    body: CartUpdateIn,
+    session_id: str = Depends(get_session_id),
+    guest_cart: str | None = Header(default=None, alias=GUEST_CART_HEADER),
+    db: Session = Depends(get_db),
+):
+    """item_id is the line's 1-based position, as returned in the guest cart."""
+    lines = _guest_lines(session_id, guest_cart)
+    if not 1 <= body.item_id <= len(lines):
+        raise HTTPException(status_code=404, detail="Cart item not found")
+    lines[body.item_id - 1]["quantity"] = body.quantity
+    return _guest_cart_out(db, session_id, lines)
+
+
+@router.delete("/guest/remove/{item_id}", response_model=GuestCartOut)
+def remove_guest_cart_item(
+    item_id: int,
+    session_id: str = Depends(get_session_id),
+    guest_cart: str | None = Header(default=None, alias=GUEST_CART_HEADER),
+    db: Session = Depends(get_db),
+):
+    lines = _guest_lines(session_id, guest_cart)
+    if 1 <= item_id <= len(lines):
+        del lines[item_id - 1]
+    return _guest_cart_out(db, session_id, lines)
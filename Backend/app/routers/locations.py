@@ -1,43 +1,40 @@
 """Find Location: list and search store locations."""
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, func, select, Select
 
 from ..database import get_db
-from ..models import Location
+from ..serialization import dump_rows, json_bytes
+from ..models import Location, Store
 from ..schemas import LocationOut
+from ..services.single_flight import catalog_flight
 
 router = APIRouter(prefix="/locations", tags=["locations"])
 
 
-def _location_to_out(loc) -> LocationOut:
-    """Build LocationOut including is_active from related store."""
-    return LocationOut(
-        id=loc.id,
-        store_id=loc.store_id,
-        store_name=loc.store_name,
-        address=loc.address,
-        area=loc.area,
-        city=loc.city,
-        state=loc.state,
-        pincode=loc.pincode,
-        phone=loc.phone,
-        opening_time=loc.opening_time,
-        closing_time=loc.closing_time,
-        is_active=loc.store.is_active if loc.store is not None else True,
+LOCATION_COLUMNS = [
+    *(getattr(Location, name).label(name) for name in LocationOut.model_fields if name != "is_active"),
+    func.coalesce(Store.is_active, True).label("is_active"),
+]
+
+
+def _location_rows(*criteria) -> Select:
+    """Location rows as plain columns with is_active from the related store (True if unlinked)."""
+    return (
+        select(*LOCATION_COLUMNS)
+        .outerjoin(Store, Store.id == Location.store_id)
+        .where(*criteria)
+        .order_by(Location.city, Location.store_name)
     )
 
 
 @router.get("", response_model=list[LocationOut])
 def get_locations(db: Session = Depends(get_db)):
-    """Return all store locations."""
-    locations = (
-        db.query(Location)
-        .options(joinedload(Location.store))
-        .order_by(Location.city, Location.store_name)
-        .all()
-    )
-    return [_location_to_out(loc) for loc in locations]
+    """Return all store locations. Concurrent identical loads share one query."""
+    def load():
+        return dump_rows(db.execute(_location_rows()).mappings())
+
+    return json_bytes(catalog_flight.do(("locations",), load))
 
 
 @router.get("/search", response_model=list[LocationOut])
@@ -47,10 +44,9 @@ def search_locations(
 ):
     """Search stores by partial match on store_name, city, area, pincode (case-insensitive)."""
     term = f"%{q.strip()}%"
-    locations = (
-        db.query(Location)
-        .options(joinedload(Location.store))
-        .filter(
+
+    def load():
+        stmt = _location_rows(
             or_(
                 Location.store_name.ilike(term),
                 Location.city.ilike(term),
@@ -58,7 +54,6 @@ def search_locations(
                 Location.pincode.ilike(term),
             )
         )
-        .order_by(Location.city, Location.store_name)
-        .all()
-    )
-    return [_location_to_out(loc) for loc in locations]
+        return dump_rows(db.execute(stmt).mappings())
+
+    return json_bytes(catalog_flight.do(("locations_search", term), load))
@@ -1,55 +1,155 @@
-"""Menu APIs: categories, products, toppings, specialty."""
-from fastapi import APIRouter, Depends, Query
+"""Menu APIs: categories, products, toppings, specialty, full menu. Served from the in-process menu cache."""
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 
 from ..database import get_db
+from ..serialization import schema_columns, dump_rows, json_bytes
 from ..models import Category, Product, Topping
-from ..schemas import CategoryOut, ProductOut, ToppingOut
+from ..schemas import CategoryOut, ProductOut, ToppingOut, MenuFullOut
+from ..services.menu_cache import menu_cache
+from ..services.menu_service import build_full_menu
+from ..services.store_menu import store_menu
+from ..services.product_search import search_product_ids
+from ..services.recommendations import recommender
+from ..services.single_flight import catalog_flight
+from ..services.menu_bundle import current_menu_bundle, bundle_file_for
 
 router = APIRouter(prefix="/menu", tags=["menu"])
 
 
-@router.get("/categories")
+PRODUCT_COLUMNS = schema_columns(Product, ProductOut)
+
+
+def _product_rows_by_ids(db: Session, ids: list[int]) -> list[dict]:
+    """Product rows as dicts, in the order of ids (one IN query)."""
+    if not ids:
+        return []
+    by_id = {r["id"]: r for r in db.execute(select(*PRODUCT_COLUMNS).where(Product.id.in_(ids))).mappings()}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+@router.get("/categories", response_model=list[CategoryOut])
 def get_categories(db: Session = Depends(get_db)):
-    rows = db.query(Category).order_by(Category.id).all()
-    return [CategoryOut.model_validate(r) for r in rows]
+    def load():
+        rows = db.execute(select(*schema_columns(Category, CategoryOut)).order_by(Category.id)).mappings()
+        return dump_rows(rows)
+
+    return json_bytes(menu_cache.get_or_load(("categories",), load))
 
 
-@router.get("/products")
+@router.get("/products", response_model=list[ProductOut])
 def get_products(
     category_id: int | None = Query(None),
     type: str | None = Query(None),
+    store_id: int | None = Query(None),
     db: Session = Depends(get_db),
 ):
-    q = db.query(Product)
-    if category_id is not None:
-        q = q.filter(Product.category_id == category_id)
-    if type is not None:
-        q = q.filter(Product.type == type)
-    rows = q.order_by(Product.id).all()
-    return [ProductOut.model_validate(r) for r in rows]
+    """Products, optionally resolved for a store: sold-out items dropped, price overrides applied."""
+    def load():
+        stmt = select(*PRODUCT_COLUMNS)
+        if category_id is not None:
+            stmt = stmt.where(Product.category_id == category_id)
+        if type is not None:
+            stmt = stmt.where(Product.type == type)
+        rows = [dict(r) for r in db.execute(stmt.order_by(Product.id)).mappings()]
+        if store_id is None:
+            return dump_rows(rows)
+        matrix = store_menu.matrix(db)
+        resolved = []
+        for p in rows:
+            if matrix.is_available(store_id, p["id"]):
+                p["base_price"] = matrix.price(store_id, p["id"])
+                resolved.append(p)
+        return dump_rows(resolved)
+
+    return json_bytes(menu_cache.get_or_load(("products", category_id, type, store_id), load))
 
 
-@router.get("/toppings")
+@router.get("/toppings", response_model=list[ToppingOut])
 def get_toppings(
     type: str | None = Query(None),
     db: Session = Depends(get_db),
 ):
-    q = db.query(Topping)
-    if type is not None:
-        q = q.filter(Topping.type == type)
-    rows = q.order_by(Topping.type, Topping.name).all()
-    return [ToppingOut.model_validate(r) for r in rows]
+    def load():
+        stmt = select(*schema_columns(Topping, ToppingOut))
+        if type is not None:
+            stmt = stmt.where(Topping.type == type)
+        return dump_rows(db.execute(stmt.order_by(Topping.type, Topping.name)).mappings())
 
+    return json_bytes(menu_cache.get_or_load(("toppings", type), load))
 
-@router.get("/specialty")
+
+@router.get("/specialty", response_model=list[ProductOut])
 def get_specialty(db: Session = Depends(get_db)):
     """Specialty category products (pizzas)."""
-    cat = db.query(Category).filter(Category.name == "Specialty").first()
-    if not cat:
-        return []
-    rows = db.query(Product).filter(
-        and_(Product.category_id == cat.id, Product.type == "pizza")
-    ).order_by(Product.id).all()
-    return [ProductOut.model_validate(r) for r in rows]
+    def load():
+        stmt = (
+            select(*PRODUCT_COLUMNS)
+            .join(Category, Category.id == Product.category_id)
+            .where(and_(Category.name == "Specialty", Product.type == "pizza"))
+            .order_by(Product.id)
+        )
+        return dump_rows(db.execute(stmt).mappings())
+
+    return json_bytes(menu_cache.get_or_load(("specialty",), load))
+
+
+@router.get("/search", response_model=list[ProductOut])
+def search_menu(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Ranked full-text search over product name, description and default topping names."""
+    return json_bytes(dump_rows(_product_rows_by_ids(db, search_product_ids(db, q, limit))))
+
+
+@router.get("/recommendations", response_model=list[ProductOut])
+def get_recommendations(
+    product_id: int = Query(...),
+    limit: int = Query(5, ge=1, le=20),
+    db: Session = Depends(get_db),
+):
+    """Products most often ordered together with product_id (from precomputed co-occurrence counts)."""
+    return json_bytes(dump_rows(_product_rows_by_ids(db, recommender.top(product_id, limit))))
+
+
+@router.get("/full", response_model=MenuFullOut)
+def get_full_menu(db: Session = Depends(get_db)):
+    """Categories with products (incl. default topping ids) and toppings grouped by type, in one call."""
+    body = menu_cache.get_or_load(("full",), lambda: build_full_menu(db).model_dump_json().encode("utf-8"))
+    return json_bytes(body)
+
+
+@router.get("/bundle")
+def get_menu_bundle(db: Session = Depends(get_db)):
+    """Pointer to the current content-hashed menu bundle. Rebuilt when the menu changes."""
+    bundle = current_menu_bundle(db)
+    return {"hash": bundle["hash"], "url": bundle["url"]}
+
+
+@router.get("/static/{filename}")
+def get_menu_static(
+    filename: str,
+    accept_encoding: str | None = Header(None),
+):
+    """Serve a precompressed menu bundle. Content-hashed, so cached forever."""
+    found = bundle_file_for(filename, accept_encoding or "")
+    if found is None:
+        raise HTTPException(status_code=404, detail="Menu bundle not found")
+    path, encoding = found
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept-Encoding",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path, media_type="application/json", headers=headers)
+
+
+@router.get("/cache/stats")
+def get_menu_cache_stats():
+    """Menu cache counters (version, entries, hits, misses, invalidations) and catalog single-flight counters."""
+    return {**menu_cache.stats(), "single_flight": catalog_flight.stats()}
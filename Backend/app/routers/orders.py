@@ -1,23 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from ..database import get_db
-from ..models import Cart, CartItem, Order, User, Store, Location
-from ..schemas import CheckoutIn, CheckoutOut, OrderOut, OrderItemOut
+from ..serialization import dump_models, json_bytes
+from ..models import Cart, CartItem, Order, OrderItem, Store, Location, IdempotencyKey
+from ..models.store import normalize_store_name
+from ..schemas import CheckoutIn, CheckoutOut, OrderOut, ReorderOut
 from ..dependencies import get_current_user
+from ..principal_cache import UserPrincipal
+from ..services.pricing import reprice_cart_items, PricingError
+from ..services.recommendations import recommender
+from ..services.cart_snapshot import bump_cart_version
+from ..services.cart_lines import get_or_create_cart, price_available_lines, upsert_cart_lines
+from ..services.cart_view import load_cart_out
+from ..services.order_items import order_item_rows, order_items_out
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
+class _CartChanged(Exception):
+    pass
+
+
+def _replayed_checkout(db: Session, user_id: int, key: str) -> CheckoutOut | None:
+    record = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+    ).first()
+    if record is None:
+        return None
+    return CheckoutOut(**record.response)
+
+
 @router.post("/checkout", response_model=CheckoutOut)
 def checkout(
     body: CheckoutIn,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ):
+    """
+    Place the order in one transaction: optional store creation and location linking, the order,
+    the Idempotency-Key record and the cart clear commit together. A retry with the same
+    Idempotency-Key returns the original CheckoutOut without writing; a concurrent duplicate
+    without a key loses the cart-version check and gets 409.
+    """
+    key = (idempotency_key or "").strip()[:255] or None
+    if key is not None:
+        replayed = _replayed_checkout(db, current_user.id, key)
+        if replayed is not None:
+            return replayed
+
     cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
     if not cart:
         raise HTTPException(status_code=400, detail="Cart is empty")
+    cart_id, cart_version = cart.id, cart.version
     items = (
         db.query(CartItem)
         .filter(CartItem.cart_id == cart.id)
@@ -25,25 +63,12 @@ def checkout(
         .all()
     )
     if not items:
+        # The duplicate we are racing may have just committed and emptied the cart.
+        replayed = _replayed_checkout(db, current_user.id, key) if key is not None else None
+        if replayed is not None:
+            return replayed
         raise HTTPException(status_code=400, detail="Cart is empty")
 
-    total = sum(i.unit_price * i.quantity for i in items)
-    order_data = {
-        "delivery": body.model_dump(),
-        "items": [
-            {
-                "id": i.id,
-                "product_id": i.product_id,
-                "quantity": i.quantity,
-                "unit_price": i.unit_price,
-                "custom_data": i.custom_data,
-                "name": (i.product.name if i.product else (i.custom_data or {}).get("name", "Custom")),
-            }
-            for i in items
-        ],
-        "subtotal": total,
-    }
-    
    
     resolved_store_id = body.store_id
     store = db.query(Store).filter(Store.id == body.store_id).first()
@@ -55,63 +80,63 @@ def checkout(
         
         
         if store_name:
-            location = db.query(Location).filter(Location.store_name == store_name).first()
-            if location and location.store_id:
-               
-                store = db.query(Store).filter(Store.id == location.store_id).first()
-                if store:
-                    resolved_store_id = store.id
+            store_name_clean = normalize_store_name(store_name)
+            store = (
+                db.query(Store)
+                .join(Location, Location.store_id == Store.id)
+                .filter(Location.store_name_normalized == store_name_clean)
+                .first()
+            )
+            if store is None:
+                store = db.query(Store).filter(Store.name_normalized == store_name_clean).first()
+            if store:
+                resolved_store_id = store.id
         
         
         if not store and store_name:
+           
+            store = Store(
+                name=store_name.strip(),
+                address=location_data.get("address"),
+                city=location_data.get("city"),
+                state=location_data.get("state"),
+                pincode=location_data.get("pincode"),
+                phone=location_data.get("phone"),
+                is_active=True,
+            )
+            db.add(store)
+            db.flush()
             
-            def normalize_store_name(name):
-                normalized = ' '.join(name.strip().upper().split())
-                normalized = normalized.replace(' - ', '-').replace(' -', '-').replace('- ', '-')
-                return normalized
             
-            store_name_clean = normalize_store_name(store_name)
-           
-            all_stores = db.query(Store).all()
-            for s in all_stores:
-                if s.name:
-                    s_name_clean = normalize_store_name(s.name)
-                    if s_name_clean == store_name_clean:
-                        store = s
-                        break
-                   
-                    if store_name_clean in s_name_clean or s_name_clean in store_name_clean:
-                        store = s
-                        break
+            from ..services.admin_service import link_locations_to_store
+            link_locations_to_store(db, store)
             
-            if store:
-                resolved_store_id = store.id
-            else:
-               
-                store = Store(
-                    name=store_name.strip(),
-                    address=location_data.get("address"),
-                    city=location_data.get("city"),
-                    state=location_data.get("state"),
-                    pincode=location_data.get("pincode"),
-                    phone=location_data.get("phone"),
-                    is_active=True,
-                )
-                db.add(store)
-                db.commit()
-                db.refresh(store)
-                
-                
-                from ..services.admin_service import link_locations_to_store
-                link_locations_to_store(db, store)
-                db.commit()
-                
-                resolved_store_id = store.id
+            resolved_store_id = store.id
         elif not store:
             raise HTTPException(status_code=400, detail="Invalid store_id and no location data provided.")
     
     if not store:
         raise HTTPException(status_code=400, detail="Invalid store_id. Store not found.")
+
+    try:
+        total = reprice_cart_items(db, items, store_id=resolved_store_id)
+    except PricingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    order_data = {
+        "delivery": body.model_dump(),
+        "items": [
+            {
+                "id": i.id,
+                "product_id": i.product_id,
+                "quantity": i.quantity,
+                "unit_price": i.unit_price,
+                "custom_data": i.custom_data,
+                "name": (i.product.name if i.product else (i.custom_data or {}).get("name", "Custom")),
+            }
+            for i in items
+        ],
+        "subtotal": total,
+    }
     
     order = Order(
         session_id=f"user_{current_user.id}",
@@ -121,30 +146,36 @@ def checkout(
         total=total,
         location=body.location if body.location else None,
         status="PENDING",
+        items=[OrderItem(**row) for row in order_item_rows(order_data)],
     )
     db.add(order)
-    db.commit()
-    db.refresh(order)
+    db.flush()
+    result = CheckoutOut(id=order.id, total=order.total)
+    if key is not None:
+        db.add(IdempotencyKey(user_id=current_user.id, key=key, order_id=order.id, response=result.model_dump()))
 
-    db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-    db.commit()
+    db.query(CartItem).filter(CartItem.cart_id == cart_id).delete()
+    try:
+        if not bump_cart_version(db, cart_id, expected_version=cart_version):
+            raise _CartChanged()
+        db.commit()
+    except (_CartChanged, IntegrityError) as e:
+        # Lost a race: a concurrent checkout (same Idempotency-Key or same cart) committed first.
+        db.rollback()
+        replayed = _replayed_checkout(db, current_user.id, key) if key is not None else None
+        if replayed is not None:
+            return replayed
+        if isinstance(e, IntegrityError):
+            raise
+        raise HTTPException(status_code=409, detail="Cart changed during checkout, please review it and retry")
 
-    return CheckoutOut(id=order.id, total=order.total)
+    recommender.record_order(i["product_id"] for i in order_data["items"] if i["product_id"] is not None)
+    return result
 
 
 def _order_to_out(order: Order) -> OrderOut:
-    """Build OrderOut with items list (product names) from order_data."""
-    items = []
-    if order.order_data and isinstance(order.order_data, dict):
-        for row in order.order_data.get("items") or []:
-            if isinstance(row, dict):
-                items.append(
-                    OrderItemOut(
-                        product_name=row.get("name", "Custom"),
-                        quantity=int(row.get("quantity", 0)),
-                        unit_price=float(row.get("unit_price", 0)),
-                    )
-                )
+    """Build OrderOut with items list (product names) from order_items; customer details from order_data."""
+    items = order_items_out(order)
     
     
     customer_name = None
@@ -192,22 +223,23 @@ def _order_to_out(order: Order) -> OrderOut:
 
 @router.get("", response_model=list[OrderOut])
 def list_orders(
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     orders = (
         db.query(Order)
+        .options(selectinload(Order.items))
         .filter(Order.user_id == current_user.id)
         .order_by(Order.created_at.desc())
         .all()
     )
-    return [_order_to_out(o) for o in orders]
+    return json_bytes(dump_models(OrderOut, [_order_to_out(o) for o in orders]))
 
 
 @router.get("/{order_id}", response_model=OrderOut)
 def get_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     order = db.query(Order).filter(
@@ -217,3 +249,40 @@ def get_order(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     return _order_to_out(order)
+
+
+@router.post("/{order_id}/reorder", response_model=ReorderOut)
+def reorder(
+    order_id: int,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Copy a past order's lines into the cart in one transaction, repriced at today's prices.
+    Lines that no longer price (product gone, custom selection changed) are skipped and counted in
+    skipped_lines; identical lines merge with what is already in the cart.
+    """
+    order = db.query(Order).filter(
+        Order.id == order_id,
+        Order.user_id == current_user.id,
+    ).first()
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    rows = (order.order_data or {}).get("items") or []
+    items = [
+        {
+            "product_id": row.get("product_id"),
+            "quantity": int(row.get("quantity") or 0),
+            "custom_data": row.get("custom_data"),
+        }
+        for row in rows
+        if isinstance(row, dict) and int(row.get("quantity") or 0) > 0
+    ]
+    lines, _, _ = price_available_lines(db, items)
+    if not lines:
+        raise HTTPException(status_code=400, detail="None of the items in this order are available anymore")
+
+    cart_id = get_or_create_cart(db, current_user.id).id
+    upsert_cart_lines(db, cart_id, lines)
+    db.commit()
+    return ReorderOut(**load_cart_out(db, cart_id).model_dump(), skipped_lines=len(items) - len(lines))
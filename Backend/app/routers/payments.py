@@ -12,12 +12,12 @@ from ..database import get_db
 from ..models import Order
 from ..schemas import CreatePaymentIntentIn, CreatePaymentIntentOut
 from ..dependencies import get_current_user
+from ..principal_cache import UserPrincipal
 from ..services.stripe_service import (
     create_payment_intent as stripe_create_payment_intent,
     retrieve_payment_intent,
     verify_webhook_signature,
 )
-from ..models import User
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -41,7 +41,7 @@ def _customer_email_from_order(order: Order) -> str | None:
 @router.post("/create-payment-intent", response_model=CreatePaymentIntentOut)
 def create_payment_intent(
     body: CreatePaymentIntentIn,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -1,7 +1,8 @@
 from .category import CategoryOut
 from .product import ProductOut, ProductList
 from .topping import ToppingOut, ToppingList
-from .cart import CartItemIn, CartItemOut, CartOut, CartUpdateIn
+from .menu import MenuProductOut, MenuCategoryOut, MenuFullOut
+from .cart import CartItemIn, CartItemOut, CartOut, CartUpdateIn, GuestCartOut, ReorderOut
 from .order import (
     OrderOut,
     OrderItemOut,
@@ -30,6 +31,8 @@ from .admin import (
     AdminCreateIn,
     ChangePasswordIn,
     AdminCompleteSetupIn,
+    StoreProductOut,
+    StoreProductUpdateIn,
 )
 
 __all__ = [
@@ -38,10 +41,15 @@ __all__ = [
     "ProductList",
     "ToppingOut",
     "ToppingList",
+    "MenuProductOut",
+    "MenuCategoryOut",
+    "MenuFullOut",
     "CartItemIn",
     "CartItemOut",
     "CartOut",
     "CartUpdateIn",
+    "GuestCartOut",
+    "ReorderOut",
     "OrderOut",
     "OrderItemOut",
     "CheckoutIn",
@@ -72,4 +80,6 @@ __all__ = [
     "AdminCreateIn",
     "ChangePasswordIn",
     "AdminCompleteSetupIn",
+    "StoreProductOut",
+    "StoreProductUpdateIn",
 ]
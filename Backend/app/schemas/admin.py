@@ -1,5 +1,5 @@
 """Admin schemas for authentication and management."""
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
@@ -155,3 +155,19 @@ class AdminMeOut(BaseModel):
     email: Optional[str] = None
     phone: Optional[str] = None
     store: Optional[StoreOut] = None
+
+
+class StoreProductOut(BaseModel):
+    """Product as resolved for the admin's store (GET/PATCH /admin/menu)."""
+    product_id: int
+    name: str
+    base_price: float
+    price: float
+    is_available: bool
+    price_override: Optional[float] = None
+
+
+class StoreProductUpdateIn(BaseModel):
+    """Body for PATCH /admin/menu/{product_id}. Send price_override: null to clear it."""
+    is_available: Optional[bool] = None
+    price_override: Optional[float] = Field(default=None, ge=0)
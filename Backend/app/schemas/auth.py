@@ -41,6 +41,8 @@ class TokenOut(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserOut
+    merged_cart_lines: int = 0  # guest cart lines (X-Guest-Cart) merged into the user's cart at login
+    skipped_cart_lines: int = 0  # guest cart lines dropped at login because they no longer price
 
 
 class MessageOut(BaseModel):
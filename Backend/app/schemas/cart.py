@@ -28,3 +28,16 @@ class CartItemOut(BaseModel):
 
 class CartOut(BaseModel):
     items: list[CartItemOut]
+    subtotal: float = 0.0
+    line_count: int = 0
+
+
+class ReorderOut(CartOut):
+    """Cart after a reorder; skipped_lines counts order lines that can no longer be added."""
+    skipped_lines: int = 0
+
+
+class GuestCartOut(BaseModel):
+    """Guest cart plus the re-signed token to send back in X-Guest-Cart."""
+    cart_token: str
+    cart: CartOut
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+from .product import ProductOut
+from .topping import ToppingOut
+
+
+class MenuProductOut(ProductOut):
+    default_topping_ids: list[int] = []
+
+
+class MenuCategoryOut(BaseModel):
+    id: int
+    name: str
+    products: list[MenuProductOut]
+
+
+class MenuFullOut(BaseModel):
+    """Whole menu in one payload: categories with products, toppings grouped by type."""
+    categories: list[MenuCategoryOut]
+    toppings: dict[str, list[ToppingOut]]
@@ -5,6 +5,7 @@ class ToppingOut(BaseModel):
     id: int
     name: str
     type: str 
+    price: float = 0.0
 
     class Config:
         from_attributes = True
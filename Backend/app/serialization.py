@@ -0,0 +1,38 @@
+"""
+Batch JSON serialization for list endpoints.
+
+Instead of model_validate per row followed by FastAPI validating the response again, list
+endpoints either select plain column rows and dump them straight to JSON, or dump a list of
+already-built schema objects through one cached list-level TypeAdapter. Either way the body is
+encoded once and returned as bytes (response_model is kept on routes for the OpenAPI docs).
+"""
+from functools import lru_cache
+from typing import Any, Iterable
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def schema_columns(orm_model, schema: type[BaseModel]) -> list:
+    """ORM columns for every field of schema, labelled by field name (for direct row-to-dict selects)."""
+    return [getattr(orm_model, name).label(name) for name in schema.model_fields]
+
+
+def dump_rows(rows: Iterable[Any]) -> bytes:
+    """JSON-encode result mappings (or dicts) as a list in one call."""
+    return to_json([dict(r) for r in rows])
+
+
+def dump_models(schema: type[BaseModel], items: list[BaseModel]) -> bytes:
+    """JSON-encode a list of schema objects through the cached list adapter (field serializers apply)."""
+    return list_adapter(schema).dump_json(items)
+
+
+def json_bytes(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
@@ -1,4 +1,5 @@
 from .seed import seed_if_empty, seed_locations_if_empty, seed_stores_from_locations
+from .menu_cache import menu_cache, invalidate_menu
 from .stripe_service import (
     create_payment_intent,
     retrieve_payment_intent,
@@ -9,6 +10,8 @@ __all__ = [
     "seed_if_empty",
     "seed_locations_if_empty",
     "seed_stores_from_locations",
+    "menu_cache",
+    "invalidate_menu",
     "create_payment_intent",
     "retrieve_payment_intent",
     "verify_webhook_signature",
@@ -1,10 +1,11 @@
 """Admin authentication service using bcrypt. JWT creation in auth module."""
 import secrets
 import string
-import bcrypt
 from sqlalchemy.orm import Session
 
+from ..hashing import password_hasher
 from ..models import Admin, Store, Location
+from ..models.store import normalize_store_name
 
 
 def generate_secure_password(length: int = 12) -> str:
@@ -14,15 +15,18 @@ def generate_secure_password(length: int = 12) -> str:
 
 
 def hash_password(password: str) -> str:
-    """Hash password using bcrypt directly (same as auth_service)."""
-    raw = password.encode("utf-8")[:72]
-    return bcrypt.hashpw(raw, bcrypt.gensalt()).decode("utf-8")
+    """Hash password with bcrypt in the dedicated hashing pool (same as auth_service)."""
+    return password_hasher.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    """Verify password using bcrypt directly (same as auth_service)."""
-    raw = plain.encode("utf-8")[:72]
-    return bcrypt.checkpw(raw, hashed.encode("utf-8"))
+    """Verify password with bcrypt in the dedicated hashing pool (same as auth_service)."""
+    return password_hasher.verify(plain, hashed)
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """True if the stored hash uses a different bcrypt cost than the current one."""
+    return password_hasher.needs_rehash(hashed)
 
 
 def get_admin_by_email(db: Session, email: str) -> Admin | None:
@@ -162,40 +166,13 @@ def ensure_store_exists(db: Session, admin: Admin) -> Store | None:
     return store
 
 
-def normalize_store_name(name: str) -> str:
-    """Normalize store name for matching: remove extra spaces, normalize dash spacing, uppercase."""
-    if not name:
-        return ""
-    normalized = ' '.join(name.strip().upper().split())
-    normalized = normalized.replace(' - ', '-').replace(' -', '-').replace('- ', '-')
-    return normalized
-
-
 def link_locations_to_store(db: Session, store: Store) -> None:
     """Link locations to a store by matching normalized store names. Updates locations even if already linked."""
     if not store.name:
         return
-    
-    store_name_clean = normalize_store_name(store.name)
-   
-    locations = db.query(Location).all()
-    
-    for location in locations:
-        if not location.store_name:
-            continue
-        
-        loc_name_clean = normalize_store_name(location.store_name)
-        
-       
-        is_match = (
-            loc_name_clean == store_name_clean or 
-            loc_name_clean in store_name_clean or 
-            store_name_clean in loc_name_clean
-        )
-        
-        if is_match:
-           
-            location.store_id = store.id
+    db.query(Location).filter(
+        Location.store_name_normalized == normalize_store_name(store.name)
+    ).update({Location.store_id: store.id}, synchronize_session=False)
 
 
 def create_store(
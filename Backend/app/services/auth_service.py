@@ -1,20 +1,25 @@
 from datetime import datetime, timezone, timedelta
-import bcrypt
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from ..config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..hashing import password_hasher
+from ..token_cache import TokenCache
 from ..models import User
 
+user_token_cache = TokenCache()
+
 
 def hash_password(password: str) -> str:
-    raw = password.encode("utf-8")[:72]
-    return bcrypt.hashpw(raw, bcrypt.gensalt()).decode("utf-8")
+    return password_hasher.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    raw = plain.encode("utf-8")[:72]
-    return bcrypt.checkpw(raw, hashed.encode("utf-8"))
+    return password_hasher.verify(plain, hashed)
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    return password_hasher.needs_rehash(hashed)
 
 
 def get_user_by_email(db: Session, email: str) -> User | None:
@@ -37,9 +42,16 @@ def create_access_token(subject: int | str) -> str:
 
 
 def decode_access_token(token: str) -> int | None:
+    user_id = user_token_cache.get(token)
+    if user_id is not None:
+        return user_id
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         sub = payload.get("sub")
-        return int(sub) if sub else None
-    except JWTError:
+        user_id = int(sub) if sub else None
+    except (JWTError, ValueError):
         return None
+    if user_id is not None:
+        user_token_cache.put(token, payload.get("exp"), user_id)
+    return user_id
+
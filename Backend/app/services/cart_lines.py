@@ -0,0 +1,232 @@
+"""
+Cart line merging.
+
+Every cart line carries line_key, a hash of its product_id and canonical custom_data (keys
+sorted, list order ignored, server-computed "price" excluded). Adding a line is a single
+INSERT ... ON CONFLICT (cart_id, line_key) DO UPDATE that bumps the existing line's quantity
+(capped at MAX_LINE_QUANTITY) and refreshes its unit price; batches go in one multi-row statement.
+Dialects without ON CONFLICT fall back to SELECT by (cart_id, line_key), then UPDATE or INSERT.
+Both upserts bump the cart version in the same transaction. price_lines turns client lines
+(product_id, quantity, custom_data) into server-priced rows with one product IN query;
+price_available_lines does the same for stored lines, skipping the ones that no longer price.
+"""
+import hashlib
+import json
+from typing import Any, Iterable
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Cart, CartItem, Product
+from .cart_snapshot import bump_cart_version
+from .pricing import price_custom_pizza, PricingError
+
+MAX_LINE_QUANTITY = 99
+
+_IGNORED_KEYS = frozenset({"price"})
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items() if k not in _IGNORED_KEYS}
+    if isinstance(value, (list, tuple)):
+        items = [_canonical(v) for v in value]
+        return sorted(items, key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    return value
+
+
+def line_key(product_id: int | None, custom_data: dict | None) -> str:
+    payload = {"product_id": product_id, "custom_data": _canonical(custom_data) if custom_data else None}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class UnknownProducts(LookupError):
+    def __init__(self, product_ids: list[int]):
+        super().__init__(f"Product not found: {product_ids}")
+        self.product_ids = product_ids
+
+
+def get_or_create_cart(db: Session, user_id: int) -> Cart:
+    cart = db.query(Cart).filter(Cart.user_id == user_id).first()
+    if not cart:
+        cart = Cart(user_id=user_id, session_id=f"user_{user_id}")
+        db.add(cart)
+        db.commit()
+        db.refresh(cart)
+    return cart
+
+
+def _load_products(db: Session, items: list[dict]) -> dict[int, Product]:
+    product_ids = {i["product_id"] for i in items if i.get("product_id") is not None}
+    if not product_ids:
+        return {}
+    return {p.id: p for p in db.query(Product).filter(Product.id.in_(product_ids)).all()}
+
+
+def _price_line(db: Session, item: dict, products: dict[int, Product]) -> dict:
+    """Server-priced line for one client item whose product (if any) is in products."""
+    product_id, custom_data = item.get("product_id"), item.get("custom_data")
+    if product_id is not None:
+        unit_price = float(products[product_id].base_price)
+    else:
+        if not custom_data or not isinstance(custom_data, dict):
+            raise PricingError("custom_data required for custom pizza")
+        unit_price = price_custom_pizza(db, custom_data)
+        custom_data = {**custom_data, "price": unit_price}
+    return {
+        "product_id": product_id,
+        "quantity": item["quantity"],
+        "unit_price": unit_price,
+        "custom_data": custom_data,
+    }
+
+
+def price_lines(db: Session, items: Iterable[dict]) -> tuple[list[dict], dict[int, Product]]:
+    """
+    Server-priced line dicts (product_id, quantity, unit_price, custom_data) plus the products used.
+    Unknown product ids raise UnknownProducts; custom pizzas without custom_data or with unknown
+    selections raise PricingError.
+    """
+    items = list(items)
+    products = _load_products(db, items)
+    missing = sorted({i["product_id"] for i in items if i.get("product_id") is not None} - products.keys())
+    if missing:
+        raise UnknownProducts(missing)
+    return [_price_line(db, item, products) for item in items], products
+
+
+def price_available_lines(db: Session, items: Iterable[dict]) -> tuple[list[dict], list[dict], dict[int, Product]]:
+    """
+    Like price_lines for lines stored earlier (guest tokens, past orders): items that can no longer
+    be priced (product gone, or a custom selection that no longer prices) are skipped instead of
+    failing the batch. Returns (priced lines, the items they were priced from, products).
+    """
+    items = list(items)
+    products = _load_products(db, items)
+    lines, kept = [], []
+    for item in items:
+        if item.get("product_id") is not None and item["product_id"] not in products:
+            continue
+        try:
+            lines.append(_price_line(db, item, products))
+        except PricingError:
+            continue
+        kept.append(item)
+    return lines, kept, products
+
+
+def _dialect_insert(db: Session):
+    """(insert, least) for dialects with INSERT ... ON CONFLICT, else (None, None)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert, func.least
+    if dialect == "sqlite":
+        return sqlite.insert, func.min
+    return None, None
+
+
+def _merge_line_portable(db: Session, cart_id: int, line: dict) -> tuple[int, int]:
+    """
+    Fallback upsert of one line (line_key set): SELECT the identical line, then UPDATE or INSERT.
+    An INSERT that loses a race to the unique (cart_id, line_key) is retried as an UPDATE.
+    Returns (id, quantity) of the line.
+    """
+    for _ in range(2):
+        existing = db.execute(
+            select(CartItem.id, CartItem.quantity).where(
+                CartItem.cart_id == cart_id, CartItem.line_key == line["line_key"]
+            )
+        ).first()
+        if existing is not None:
+            quantity = min(existing.quantity + line["quantity"], MAX_LINE_QUANTITY)
+            db.execute(
+                update(CartItem)
+                .where(CartItem.id == existing.id)
+                .values(quantity=quantity, unit_price=line["unit_price"], custom_data=line["custom_data"])
+            )
+            return existing.id, quantity
+        try:
+            with db.begin_nested():
+                result = db.execute(insert(CartItem).values(**line, cart_id=cart_id))
+            return result.inserted_primary_key[0], line["quantity"]
+        except IntegrityError:
+            continue
+    raise IntegrityError("cart line upsert", None, None)
+
+
+def _merge_on_conflict(stmt, least):
+    """ON CONFLICT (cart_id, line_key): add the quantities (capped) and take the new price."""
+    return stmt.on_conflict_do_update(
+        index_elements=[CartItem.cart_id, CartItem.line_key],
+        set_={
+            "quantity": least(CartItem.quantity + stmt.excluded.quantity, MAX_LINE_QUANTITY),
+            "unit_price": stmt.excluded.unit_price,
+            "custom_data": stmt.excluded.custom_data,
+        },
+    )
+
+
+def merge_lines(lines: list[dict]) -> list[dict]:
+    """
+    Collapse identical lines (same line_key) of one batch, summing quantities; order kept.
+    Each line is a dict with product_id, quantity, unit_price, custom_data; line_key is added.
+    """
+    merged: dict[str, dict] = {}
+    for line in lines:
+        key = line_key(line["product_id"], line["custom_data"])
+        if key in merged:
+            merged[key]["quantity"] = min(merged[key]["quantity"] + line["quantity"], MAX_LINE_QUANTITY)
+        else:
+            merged[key] = {**line, "quantity": min(line["quantity"], MAX_LINE_QUANTITY), "line_key": key}
+    return list(merged.values())
+
+
+def upsert_cart_lines(db: Session, cart_id: int, lines: list[dict]) -> None:
+    """Insert/merge many lines in one multi-row statement (identical lines in the batch are pre-merged)."""
+    if not lines:
+        return
+    dialect_insert, least = _dialect_insert(db)
+    if dialect_insert is None:
+        for line in merge_lines(lines):
+            _merge_line_portable(db, cart_id, line)
+    else:
+        stmt = dialect_insert(CartItem).values([{**line, "cart_id": cart_id} for line in merge_lines(lines)])
+        db.execute(_merge_on_conflict(stmt, least))
+    bump_cart_version(db, cart_id)
+
+
+def upsert_cart_line(
+    db: Session,
+    cart_id: int,
+    product_id: int | None,
+    quantity: int,
+    unit_price: float,
+    custom_data: dict | None,
+) -> CartItem:
+    """Insert the line or merge it into the identical one in one statement. Returns a detached CartItem."""
+    line = {
+        "product_id": product_id,
+        "quantity": min(quantity, MAX_LINE_QUANTITY),
+        "unit_price": unit_price,
+        "custom_data": custom_data,
+        "line_key": line_key(product_id, custom_data),
+    }
+    dialect_insert, least = _dialect_insert(db)
+    if dialect_insert is None:
+        item_id, merged_quantity = _merge_line_portable(db, cart_id, line)
+    else:
+        stmt = dialect_insert(CartItem).values(**line, cart_id=cart_id)
+        row = db.execute(_merge_on_conflict(stmt, least).returning(CartItem.id, CartItem.quantity)).one()
+        item_id, merged_quantity = row.id, row.quantity
+    bump_cart_version(db, cart_id)
+    return CartItem(
+        id=item_id,
+        cart_id=cart_id,
+        product_id=product_id,
+        quantity=merged_quantity,
+        unit_price=unit_price,
+        custom_data=custom_data,
+    )
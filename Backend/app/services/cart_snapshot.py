@@ -0,0 +1,59 @@
+"""
+Versioned cart snapshots.
+
+cart.version is bumped in the same transaction as every cart mutation. GET /cart reads only
+(id, version) for the user's cart; if the cached snapshot was rendered at that version its JSON
+bytes are served as-is (or 304 when the client's ETag matches), so an unchanged cart costs one
+indexed lookup and an integer comparison instead of loading and serializing every line.
+The version lives in the database, so snapshots stay correct across worker processes.
+"""
+import time
+from typing import Callable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import CART_SNAPSHOT_CACHE_SIZE, CART_SNAPSHOT_TTL_SECONDS
+from ..models import Cart
+from ..token_cache import TokenCache
+
+
+def bump_cart_version(db: Session, cart_id: int, expected_version: int | None = None) -> bool:
+    """
+    Mark the cart changed (version and updated_at); call inside the mutating transaction.
+    With expected_version the bump only applies if nobody changed the cart since it was read;
+    returns False if it did not apply.
+    """
+    query = db.query(Cart).filter(Cart.id == cart_id)
+    if expected_version is not None:
+        query = query.filter(Cart.version == expected_version)
+    updated = query.update(
+        {Cart.version: Cart.version + 1, Cart.updated_at: func.now()}, synchronize_session=False
+    )
+    return updated > 0
+
+
+def cart_etag(cart_id: int, version: int) -> str:
+    return f'W/"cart-{cart_id}-{version}"'
+
+
+class CartSnapshotCache:
+    def __init__(self, maxsize: int = CART_SNAPSHOT_CACHE_SIZE, ttl_seconds: float = CART_SNAPSHOT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries = TokenCache(maxsize)
+        self.renders = 0
+
+    def get_or_render(self, cart_id: int, version: int, render: Callable[[], bytes]) -> bytes:
+        entry = self._entries.get(str(cart_id))
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        body = render()
+        self.renders += 1
+        self._entries.put(str(cart_id), time.time() + self.ttl_seconds, (version, body))
+        return body
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "renders": self.renders}
+
+
+cart_snapshots = CartSnapshotCache()
@@ -0,0 +1,135 @@
+"""
+Abandoned-cart garbage collection.
+
+Carts whose updated_at (touched by every cart mutation) is older than CART_ABANDON_AFTER_HOURS
+are deleted together with their lines, CART_SWEEP_CHUNK_SIZE carts per short transaction, so
+the sweeper never holds SQLite's write lock for long. Both deletes re-check updated_at, so a
+cart touched while a sweep is running survives. Checkout Idempotency-Key records older than
+IDEMPOTENCY_KEY_TTL_HOURS are expired the same way. The lifespan hook runs it every
+CART_SWEEP_INTERVAL_SECONDS; it can also be run once: python -m app.services.cart_sweeper
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..config import (
+    CART_ABANDON_AFTER_HOURS,
+    CART_SWEEP_CHUNK_SIZE,
+    CART_SWEEP_INTERVAL_SECONDS,
+    IDEMPOTENCY_KEY_TTL_HOURS,
+)
+from ..database import SessionLocal
+from ..models import Cart, CartItem, IdempotencyKey
+
+
+def sweep_abandoned_carts(
+    db: Session,
+    max_age_hours: float = CART_ABANDON_AFTER_HOURS,
+    chunk_size: int = CART_SWEEP_CHUNK_SIZE,
+) -> dict:
+    """Delete abandoned carts chunk by chunk, committing after each. Returns rows reclaimed."""
+    started = time.perf_counter()
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=max_age_hours)
+    stale = Cart.updated_at < cutoff
+    carts = items = chunks = 0
+    while True:
+        ids = db.execute(select(Cart.id).where(stale).order_by(Cart.id).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        still_stale = select(Cart.id).where(Cart.id.in_(ids), stale)
+        items += db.execute(delete(CartItem).where(CartItem.cart_id.in_(still_stale))).rowcount
+        carts += db.execute(delete(Cart).where(Cart.id.in_(ids), stale)).rowcount
+        db.commit()
+        chunks += 1
+        if len(ids) < chunk_size:
+            break
+    return {
+        "carts_deleted": carts,
+        "items_deleted": items,
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - started, 3),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def sweep_expired_idempotency_keys(
+    db: Session,
+    max_age_hours: float = IDEMPOTENCY_KEY_TTL_HOURS,
+    chunk_size: int = CART_SWEEP_CHUNK_SIZE,
+) -> int:
+    """Delete Idempotency-Key records older than max_age_hours, chunk by chunk. Returns rows deleted."""
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=max_age_hours)
+    deleted = 0
+    while True:
+        expired = select(IdempotencyKey.id).where(IdempotencyKey.created_at < cutoff)
+        ids = db.execute(expired.order_by(IdempotencyKey.id).limit(chunk_size)).scalars().all()
+        if not ids:
+            break
+        deleted += db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids))).rowcount
+        db.commit()
+        if len(ids) < chunk_size:
+            break
+    return deleted
+
+
+class CartSweeper:
+    def __init__(self, interval_seconds: float = CART_SWEEP_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.carts_deleted = 0
+        self.items_deleted = 0
+        self.idempotency_keys_deleted = 0
+        self.last_run: dict | None = None
+
+    def run_once(self) -> dict:
+        db = SessionLocal()
+        try:
+            result = sweep_abandoned_carts(db)
+            result["idempotency_keys_deleted"] = sweep_expired_idempotency_keys(db)
+        finally:
+            db.close()
+        with self._lock:
+            self.runs += 1
+            self.carts_deleted += result["carts_deleted"]
+            self.items_deleted += result["items_deleted"]
+            self.idempotency_keys_deleted += result["idempotency_keys_deleted"]
+            self.last_run = result
+        return result
+
+    async def run_forever(self) -> None:
+        """Sweep every interval in a worker thread until cancelled (started by the lifespan hook)."""
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await asyncio.to_thread(self.run_once)
+            except SQLAlchemyError as e:
+                # e.g. database locked for too long; try again next interval
+                with self._lock:
+                    self.last_run = {"error": str(e), "finished_at": datetime.now(timezone.utc).isoformat()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "interval_seconds": self.interval_seconds,
+                "runs": self.runs,
+                "carts_deleted": self.carts_deleted,
+                "items_deleted": self.items_deleted,
+                "idempotency_keys_deleted": self.idempotency_keys_deleted,
+                "last_run": self.last_run,
+            }
+
+
+cart_sweeper = CartSweeper()
+
+
+if __name__ == "__main__":
+    from ..database import init_db
+
+    init_db()
+    print(cart_sweeper.run_once())
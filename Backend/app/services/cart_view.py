@@ -0,0 +1,58 @@
+"""Rendering cart lines (DB rows or priced guest lines) into CartOut with subtotal and line count."""
+from sqlalchemy.orm import Session, joinedload
+
+from ..models import CartItem
+from ..schemas import CartItemOut, CartOut
+
+
+def cart_item_to_out(item: CartItem) -> dict:
+    product_name = None
+    if item.product_id and item.product:
+        product_name = item.product.name
+    elif item.custom_data and isinstance(item.custom_data, dict):
+        product_name = item.custom_data.get("name", "Custom Pizza")
+    else:
+        product_name = "Custom Pizza"
+
+    out = {
+        "id": item.id,
+        "product_id": item.product_id,
+        "product_name": product_name,
+        "quantity": item.quantity,
+        "unit_price": item.unit_price,
+        "custom_data": item.custom_data,
+        "menu_item": None,
+    }
+    if item.product_id and item.product:
+        out["menu_item"] = {
+            "id": item.product.id,
+            "name": item.product.name,
+            "price": item.unit_price,
+            "image": item.product.image or "🍕",
+        }
+    elif item.custom_data and isinstance(item.custom_data, dict):
+        out["menu_item"] = {
+            "id": None,
+            "name": item.custom_data.get("name", "Custom Pizza"),
+            "price": item.unit_price,
+            "image": item.custom_data.get("image", "🍕"),
+        }
+    return out
+
+
+def load_cart_out(db: Session, cart_id: int) -> CartOut:
+    items = (
+        db.query(CartItem)
+        .filter(CartItem.cart_id == cart_id)
+        .options(joinedload(CartItem.product))
+        .all()
+    )
+    return render_cart(items)
+
+
+def render_cart(items: list[CartItem]) -> CartOut:
+    return CartOut(
+        items=[CartItemOut(**cart_item_to_out(i)) for i in items],
+        subtotal=round(sum(i.unit_price * i.quantity for i in items), 2),
+        line_count=len(items),
+    )
@@ -0,0 +1,102 @@
+"""
+Stateless guest carts.
+
+An anonymous visitor's cart lives in a compact token the client sends back in X-Guest-Cart:
+base64url(zlib(JSON lines)) + "." + truncated HMAC-SHA256 over the X-Session-Id and payload.
+The token is bound to the session id and expires after GUEST_CART_TTL_SECONDS; it carries only
+product_id, quantity and custom_data (never prices), so browsing as a guest writes nothing to the
+database and every render is priced server-side. At login the lines are merged into the user's
+Cart with one multi-row upsert.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+import zlib
+
+from sqlalchemy.orm import Session
+
+from ..config import SECRET_KEY, GUEST_CART_TTL_SECONDS
+from .cart_lines import MAX_LINE_QUANTITY, get_or_create_cart, line_key, price_available_lines, upsert_cart_lines
+
+MAX_GUEST_LINES = 50
+MAX_TOKEN_LENGTH = 8192
+_SIGNATURE_BYTES = 16
+
+
+class GuestCartError(ValueError):
+    """Guest cart token is malformed, tampered with, expired or bound to another session."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(session_id: str, payload: str) -> str:
+    mac = hmac.new(SECRET_KEY.encode("utf-8"), f"{session_id}.{payload}".encode("utf-8"), hashlib.sha256)
+    return _b64encode(mac.digest()[:_SIGNATURE_BYTES])
+
+
+def encode_guest_cart(session_id: str, lines: list[dict]) -> str:
+    body = {
+        "iat": int(time.time()),
+        "l": [[line["product_id"], line["quantity"], line.get("custom_data")] for line in lines],
+    }
+    raw = json.dumps(body, separators=(",", ":")).encode("utf-8")
+    payload = _b64encode(zlib.compress(raw, 9))
+    return f"{payload}.{_sign(session_id, payload)}"
+
+
+def decode_guest_cart(session_id: str, token: str | None) -> list[dict]:
+    """Lines of a guest cart token ([] for no token). Raises GuestCartError if it cannot be trusted."""
+    if not token:
+        return []
+    if len(token) > MAX_TOKEN_LENGTH or token.count(".") != 1:
+        raise GuestCartError("Invalid guest cart token")
+    payload, signature = token.split(".")
+    if not hmac.compare_digest(signature, _sign(session_id, payload)):
+        raise GuestCartError("Invalid guest cart token")
+    try:
+        body = json.loads(zlib.decompress(_b64decode(payload)))
+        issued_at, raw_lines = int(body["iat"]), body["l"]
+        lines = [
+            {"product_id": product_id, "quantity": int(quantity), "custom_data": custom_data}
+            for product_id, quantity, custom_data in raw_lines
+        ]
+    except (ValueError, KeyError, TypeError, zlib.error):
+        raise GuestCartError("Invalid guest cart token")
+    if issued_at + GUEST_CART_TTL_SECONDS < time.time():
+        raise GuestCartError("Guest cart expired")
+    return lines
+
+
+def add_guest_line(lines: list[dict], product_id: int | None, quantity: int, custom_data: dict | None) -> list[dict]:
+    """Append a line, merging it into an identical one (same line_key) like the DB cart does."""
+    key = line_key(product_id, custom_data)
+    for line in lines:
+        if line_key(line["product_id"], line["custom_data"]) == key:
+            line["quantity"] = min(line["quantity"] + quantity, MAX_LINE_QUANTITY)
+            return lines
+    if len(lines) >= MAX_GUEST_LINES:
+        raise GuestCartError(f"Guest cart holds at most {MAX_GUEST_LINES} lines")
+    lines.append({"product_id": product_id, "quantity": min(quantity, MAX_LINE_QUANTITY), "custom_data": custom_data})
+    return lines
+
+
+def merge_guest_cart(db: Session, user_id: int, session_id: str, token: str) -> tuple[int, int]:
+    """
+    Merge a guest cart into the user's cart in one upsert and commit. Lines that no longer price
+    (product gone, selection renamed) are skipped. Returns (lines merged, lines skipped).
+    """
+    items = decode_guest_cart(session_id, token)
+    lines, _, _ = price_available_lines(db, items)
+    if lines:
+        cart_id = get_or_create_cart(db, user_id).id
+        upsert_cart_lines(db, cart_id, lines)
+        db.commit()
+    return len(lines), len(items) - len(lines)
@@ -0,0 +1,111 @@
+"""
+Static menu bundle: the full menu rendered to JSON under a content-hash filename,
+with gzip and brotli variants written next to it.
+
+Built at startup (lifespan) and rebuilt lazily when the menu cache version moves.
+CLI: python -m app.services.menu_bundle
+"""
+import gzip
+import hashlib
+import os
+import re
+import threading
+
+from sqlalchemy.orm import Session
+
+from ..config import MENU_BUNDLE_DIR
+from .menu_cache import menu_cache
+from .menu_service import build_full_menu
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variant is always written
+    brotli = None
+
+BUNDLE_NAME_RE = re.compile(r"^menu\.[0-9a-f]{16}\.json$")
+KEEP_BUNDLES = 3
+
+_lock = threading.Lock()
+_current: dict | None = None
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _prune_old_bundles(directory: str, keep: str) -> None:
+    """Keep the newest KEEP_BUNDLES bundles so clients holding an older pointer still resolve."""
+    names = [n for n in os.listdir(directory) if BUNDLE_NAME_RE.match(n) and n != keep]
+    names.sort(key=lambda n: os.path.getmtime(os.path.join(directory, n)), reverse=True)
+    for name in names[KEEP_BUNDLES - 1:]:
+        for suffix in ("", ".gz", ".br"):
+            try:
+                os.remove(os.path.join(directory, name + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def build_menu_bundle(db: Session, directory: str = MENU_BUNDLE_DIR) -> dict:
+    """Render the full menu and write menu.<hash>.json(.gz/.br). Returns the bundle descriptor."""
+    global _current
+    with _lock:
+        version = menu_cache.version
+        payload = build_full_menu(db).model_dump_json().encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()[:16]
+        filename = f"menu.{digest}.json"
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        if not os.path.exists(path):
+            _write_atomic(path + ".gz", gzip.compress(payload, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write_atomic(path + ".br", brotli.compress(payload, quality=11))
+            _write_atomic(path, payload)
+        else:
+            os.utime(path)
+        _prune_old_bundles(directory, keep=filename)
+        _current = {
+            "version": version,
+            "hash": digest,
+            "filename": filename,
+            "url": f"/menu/static/{filename}",
+            "directory": directory,
+        }
+        return dict(_current)
+
+
+def current_menu_bundle(db: Session) -> dict:
+    """Return the bundle for the current menu version, rebuilding it if the menu changed since the last build."""
+    current = _current
+    if current is not None and current["version"] == menu_cache.version:
+        return dict(current)
+    return build_menu_bundle(db)
+
+
+def bundle_file_for(filename: str, accept_encoding: str, directory: str = MENU_BUNDLE_DIR) -> tuple[str, str | None] | None:
+    """Pick the best precompressed variant of filename. Returns (path, content_encoding) or None if unknown."""
+    if not BUNDLE_NAME_RE.match(filename):
+        return None
+    path = os.path.join(directory, filename)
+    if not os.path.exists(path):
+        return None
+    accepted = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    if "br" in accepted and os.path.exists(path + ".br"):
+        return path + ".br", "br"
+    if "gzip" in accepted and os.path.exists(path + ".gz"):
+        return path + ".gz", "gzip"
+    return path, None
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal, init_db
+
+    init_db()
+    session = SessionLocal()
+    try:
+        bundle = build_menu_bundle(session)
+    finally:
+        session.close()
+    print(f"Wrote {os.path.join(bundle['directory'], bundle['filename'])} (+ .gz{', .br' if brotli else ''})")
@@ -0,0 +1,112 @@
+"""
+In-process menu cache with write-through invalidation.
+
+Entries are keyed by (endpoint, query params) and tagged with the menu version
+they were built from. Any committed write to Category/Product/Topping/PizzaTopping/StoreProduct
+bumps the version, so stale entries are simply ignored on the next read.
+Writes from other processes (fix scripts, other workers) are bounded by MENU_CACHE_TTL_SECONDS.
+"""
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..config import MENU_CACHE_TTL_SECONDS
+from .single_flight import catalog_flight
+from ..models import Category, Product, Topping, PizzaTopping, StoreProduct
+
+MENU_MODELS = (Category, Product, Topping, PizzaTopping, StoreProduct)
+MENU_TABLES = frozenset(m.__tablename__ for m in MENU_MODELS)
+
+
+class MenuCache:
+    def __init__(self, ttl_seconds: float = MENU_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: dict[Hashable, tuple[int, float, Any]] = {}
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return cached value for key if built from the current menu version, else call loader and store it."""
+        version = self._version
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version and entry[1] > time.monotonic():
+            with self._lock:
+                self.hits += 1
+            return entry[2]
+        with self._lock:
+            self.misses += 1
+        # Concurrent misses on a cold key share one DB load.
+        value = catalog_flight.do(("menu", version, key), loader)
+        # Store under the version read before loading: a concurrent bump makes this entry stale at once.
+        self._entries[key] = (version, time.monotonic() + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Bump the menu version; every cached entry becomes stale."""
+        with self._lock:
+            self._version += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version": self._version,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+menu_cache = MenuCache()
+
+
+def invalidate_menu() -> None:
+    """Explicitly invalidate the menu cache (e.g. after raw SQL writes to menu tables)."""
+    menu_cache.invalidate()
+
+
+def _touches_menu(session: Session) -> bool:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, MENU_MODELS):
+            return True
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_menu_dirty(session: Session, flush_context) -> None:
+    if _touches_menu(session):
+        session.info["menu_dirty"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_menu_dirty_bulk(orm_execute_state) -> None:
+    """Catch query(...).update()/delete() and bulk statements against menu tables."""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.local_table.name in MENU_TABLES:
+        orm_execute_state.session.info["menu_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    if session.info.pop("menu_dirty", False):
+        menu_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session: Session) -> None:
+    session.info.pop("menu_dirty", None)
@@ -0,0 +1,44 @@
+"""Build the aggregated menu payload with a fixed number of queries (no lazy loads)."""
+from collections import defaultdict
+
+from sqlalchemy.orm import Session
+
+from ..models import Category, Product, Topping, PizzaTopping
+from ..schemas import MenuFullOut, MenuCategoryOut, MenuProductOut, ToppingOut
+
+
+def build_full_menu(db: Session) -> MenuFullOut:
+    """
+    Categories with their products, toppings grouped by type, and each product's default topping ids.
+    Four queries regardless of menu size: categories, products, toppings, pizza_toppings.
+    """
+    categories = db.query(Category).order_by(Category.id).all()
+    products = db.query(Product).order_by(Product.id).all()
+    toppings = db.query(Topping).order_by(Topping.type, Topping.name).all()
+    links = (
+        db.query(PizzaTopping.product_id, PizzaTopping.topping_id)
+        .order_by(PizzaTopping.product_id, PizzaTopping.id)
+        .all()
+    )
+
+    defaults_by_product: dict[int, list[int]] = defaultdict(list)
+    for product_id, topping_id in links:
+        defaults_by_product[product_id].append(topping_id)
+
+    products_by_category: dict[int, list[MenuProductOut]] = defaultdict(list)
+    for p in products:
+        out = MenuProductOut.model_validate(p)
+        out.default_topping_ids = defaults_by_product.get(p.id, [])
+        products_by_category[p.category_id].append(out)
+
+    toppings_by_type: dict[str, list[ToppingOut]] = defaultdict(list)
+    for t in toppings:
+        toppings_by_type[t.type].append(ToppingOut.model_validate(t))
+
+    return MenuFullOut(
+        categories=[
+            MenuCategoryOut(id=c.id, name=c.name, products=products_by_category.get(c.id, []))
+            for c in categories
+        ],
+        toppings=dict(toppings_by_type),
+    )
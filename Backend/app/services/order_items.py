@@ -0,0 +1,99 @@
+"""
+Normalized order lines.
+
+Checkout writes one order_items row per line in the same transaction as the order, next to the
+order_data JSON (which stays the full record, delivery details included). Per-item reads and
+aggregates (top sellers per store, item counts) are plain SQL over order_items joined to orders.
+Orders created before the table existed are filled in by backfill_order_items, chunk by chunk;
+until then order_items_out falls back to decoding order_data.
+Run once by hand: python -m app.services.order_items
+"""
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from ..config import ORDER_ITEMS_BACKFILL_CHUNK_SIZE
+from ..database import SessionLocal
+from ..models import Order, OrderItem
+from ..schemas import OrderItemOut
+
+
+def order_item_rows(order_data: dict | None) -> list[dict]:
+    """order_items column values for the lines of an order_data blob (malformed lines are skipped)."""
+    rows = []
+    if order_data and isinstance(order_data, dict):
+        for position, row in enumerate(order_data.get("items") or []):
+            if not isinstance(row, dict):
+                continue
+            product_id = row.get("product_id")
+            rows.append({
+                "position": position,
+                "product_id": product_id if isinstance(product_id, int) else None,
+                "name": str(row.get("name") or "Custom")[:255],
+                "quantity": int(row.get("quantity") or 0),
+                "unit_price": float(row.get("unit_price") or 0),
+                "custom_data": row.get("custom_data"),
+            })
+    return rows
+
+
+def order_items_out(order: Order) -> list[OrderItemOut]:
+    """Lines of an order from order_items; decodes order_data only for orders not yet backfilled."""
+    if order.items:
+        return [
+            OrderItemOut(product_name=item.name, quantity=item.quantity, unit_price=item.unit_price)
+            for item in order.items
+        ]
+    return [
+        OrderItemOut(product_name=row["name"], quantity=row["quantity"], unit_price=row["unit_price"])
+        for row in order_item_rows(order.order_data)
+    ]
+
+
+def backfill_order_items(db: Session, chunk_size: int = ORDER_ITEMS_BACKFILL_CHUNK_SIZE) -> dict:
+    """Write order_items for orders that have none, chunk_size orders per transaction, in id order."""
+    started = time.perf_counter()
+    has_items = select(OrderItem.id).where(OrderItem.order_id == Order.id).exists()
+    last_id = orders = items = chunks = 0
+    while True:
+        batch = db.execute(
+            select(Order.id, Order.order_data)
+            .where(Order.id > last_id, ~has_items)
+            .order_by(Order.id)
+            .limit(chunk_size)
+        ).all()
+        if not batch:
+            break
+        rows = [{**row, "order_id": order_id} for order_id, order_data in batch for row in order_item_rows(order_data)]
+        if rows:
+            db.execute(insert(OrderItem), rows)
+        db.commit()
+        last_id = batch[-1][0]
+        orders += len(batch)
+        items += len(rows)
+        chunks += 1
+        if len(batch) < chunk_size:
+            break
+    return {
+        "orders_backfilled": orders,
+        "items_written": items,
+        "chunks": chunks,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def run_order_items_backfill() -> dict:
+    """backfill_order_items in its own session (startup task and CLI)."""
+    db = SessionLocal()
+    try:
+        return backfill_order_items(db)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    from ..database import init_db
+
+    init_db()
+    print(run_order_items_backfill())
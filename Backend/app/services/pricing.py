@@ -0,0 +1,156 @@
+"""
+Server-side pricing for cart lines.
+
+Crust/sauce/cheese/topping prices are compiled into an in-memory table keyed by Topping.id
+(plus a name index, since the frontend sends selections by name), together with product base
+prices by name: a custom line starts from the base price of the pizza it was built from
+(custom_data["name"], "Build Your Own" when absent). The table is rebuilt when the menu cache
+version moves or, like menu cache entries, after MENU_CACHE_TTL_SECONDS (which bounds price
+changes written by other processes), so pricing a custom pizza is O(toppings) with no DB access.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from sqlalchemy.orm import Session
+
+from ..models import CartItem, Product, Topping
+from .menu_cache import menu_cache
+from .store_menu import store_menu
+
+BUILD_YOUR_OWN_NAME = "Build Your Own"
+SINGLE_SELECTIONS = ("crust", "sauce", "cheese")
+MULTI_SELECTIONS = ("cheeses", "meats", "veggies", "extraCheeses", "extraVeggies", "extraToppings")
+# Display data the client stores alongside the selections; never priced.
+METADATA_KEYS = ("name", "price", "image", "description")
+EXTRA_PREFIX = "extra "
+
+
+class PricingError(ValueError):
+    """Custom pizza selection cannot be priced (unknown topping, bad shape)."""
+
+
+@dataclass
+class PriceTable:
+    version: int
+    expires_at: float
+    prices: dict[int, float] = field(default_factory=dict)
+    ids_by_name: dict[str, int] = field(default_factory=dict)
+    product_ids_by_name: dict[str, int] = field(default_factory=dict)
+    base_prices: dict[int, float] = field(default_factory=dict)
+
+    def _topping_price(self, selection: Any) -> float:
+        if isinstance(selection, dict):
+            topping_id = selection.get("id")
+            name = selection.get("name")
+        else:
+            topping_id, name = None, selection
+        if isinstance(topping_id, int) and topping_id in self.prices:
+            return self.prices[topping_id]
+        if isinstance(name, str):
+            key = name.strip().lower()
+            resolved = self.ids_by_name.get(key)
+            if resolved is None and key.startswith(EXTRA_PREFIX):
+                # "Extra Mozzarella" is another portion of Mozzarella
+                resolved = self.ids_by_name.get(key[len(EXTRA_PREFIX):].strip())
+            if resolved is not None:
+                return self.prices[resolved]
+        raise PricingError(f"Unknown topping: {name or topping_id!r}")
+
+    def base_product_id(self, custom_data: dict) -> int:
+        """Product the custom pizza was built from, by custom_data["name"]."""
+        name = custom_data.get("name") or BUILD_YOUR_OWN_NAME
+        product_id = self.product_ids_by_name.get(name.strip().lower()) if isinstance(name, str) else None
+        if product_id is None:
+            raise PricingError(f"Unknown pizza: {name!r}")
+        return product_id
+
+    def price_custom(self, custom_data: dict, base_price: float | None = None) -> float:
+        """
+        Price a custom pizza: the base product's price (or base_price, e.g. a store override) plus
+        every selection. Keys that are neither selections nor display data raise PricingError.
+        """
+        unknown = sorted(set(custom_data) - set(SINGLE_SELECTIONS) - set(MULTI_SELECTIONS) - set(METADATA_KEYS))
+        if unknown:
+            raise PricingError(f"Unknown selection: {', '.join(map(str, unknown))}")
+        if base_price is None:
+            base_price = self.base_prices[self.base_product_id(custom_data)]
+        total = base_price
+        for key in SINGLE_SELECTIONS:
+            selection = custom_data.get(key)
+            if selection:
+                total += self._topping_price(selection)
+        for key in MULTI_SELECTIONS:
+            selections = custom_data.get(key) or []
+            if not isinstance(selections, list):
+                raise PricingError(f"{key} must be a list")
+            for selection in selections:
+                total += self._topping_price(selection)
+        return round(total, 2)
+
+
+def _is_current(table: PriceTable | None) -> bool:
+    return table is not None and table.version == menu_cache.version and table.expires_at > time.monotonic()
+
+
+class PricingEngine:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._table: PriceTable | None = None
+
+    def table(self, db: Session) -> PriceTable:
+        """Current price table; reloaded (two queries) if the menu changed since it was built or it expired."""
+        table = self._table
+        if _is_current(table):
+            return table
+        with self._lock:
+            table = self._table
+            if not _is_current(table):
+                table = self._load(db)
+                self._table = table
+        return table
+
+    def _load(self, db: Session) -> PriceTable:
+        version = menu_cache.version
+        table = PriceTable(version=version, expires_at=time.monotonic() + menu_cache.ttl_seconds)
+        for topping_id, name, price in db.query(Topping.id, Topping.name, Topping.price).all():
+            table.prices[topping_id] = float(price or 0.0)
+            table.ids_by_name.setdefault(name.strip().lower(), topping_id)
+        for product_id, name, base_price in db.query(Product.id, Product.name, Product.base_price).all():
+            table.product_ids_by_name.setdefault(name.strip().lower(), product_id)
+            table.base_prices[product_id] = float(base_price or 0.0)
+        return table
+
+
+pricing_engine = PricingEngine()
+
+
+def price_custom_pizza(db: Session, custom_data: dict) -> float:
+    """Server-computed unit price for a custom pizza. Raises PricingError on unknown selections."""
+    return pricing_engine.table(db).price_custom(custom_data)
+
+
+def reprice_cart_items(db: Session, items: Iterable[CartItem], store_id: int | None = None) -> float:
+    """
+    Bulk reprice cart lines in place and return the subtotal.
+    Product lines use the store's resolved price from the store menu matrix (base_price when
+    store_id is None) and fail if sold out at that store; custom lines add the price table's
+    selections to the store's price of the pizza they were built from.
+    No per-line queries.
+    """
+    table = pricing_engine.table(db)
+    matrix = store_menu.matrix(db)
+    subtotal = 0.0
+    for item in items:
+        if item.product_id is not None and item.product is not None:
+            if not matrix.is_available(store_id, item.product_id):
+                raise PricingError(f"{item.product.name} is not available at this store")
+            item.unit_price = matrix.price(store_id, item.product_id)
+        elif isinstance(item.custom_data, dict):
+            base_product_id = table.base_product_id(item.custom_data)
+            if not matrix.is_available(store_id, base_product_id):
+                raise PricingError(f"{item.custom_data.get('name') or BUILD_YOUR_OWN_NAME} is not available at this store")
+            item.unit_price = table.price_custom(item.custom_data, base_price=matrix.price(store_id, base_product_id))
+        subtotal += item.unit_price * item.quantity
+    return round(subtotal, 2)
@@ -0,0 +1,192 @@
+"""
+Indexed product search over name, description and default topping names.
+
+SQLite: FTS5 table products_fts (rowid = products.id) maintained by triggers, ranked by bm25.
+Postgres: products.search_vector tsvector with a GIN index, maintained by triggers, ranked by ts_rank.
+Triggers keep the index in sync for ORM writes, bulk updates and raw SQL from scripts alike.
+Other backends (or SQLite built without FTS5) fall back to a LIKE scan.
+"""
+import re
+
+from sqlalchemy import text, or_
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from ..models import Product
+
+SEARCH_WEIGHTS = (10.0, 1.0, 4.0)  # name, description, toppings
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SQLITE_TOPPINGS_EXPR = """COALESCE((
+    SELECT group_concat(t.name, ' ') FROM pizza_toppings pt
+    JOIN toppings t ON t.id = pt.topping_id WHERE pt.product_id = {pid}
+), '')"""
+
+_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(name, description, toppings, tokenize='unicode61 remove_diacritics 2')",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description, toppings)
+        VALUES (NEW.id, NEW.name, COALESCE(NEW.description, ''), {_SQLITE_TOPPINGS_EXPR.format(pid="NEW.id")});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = OLD.id;
+        INSERT INTO products_fts(rowid, name, description, toppings)
+        VALUES (NEW.id, NEW.name, COALESCE(NEW.description, ''), {_SQLITE_TOPPINGS_EXPR.format(pid="NEW.id")});
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = OLD.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_pt_ai AFTER INSERT ON pizza_toppings BEGIN
+        UPDATE products_fts SET toppings = {_SQLITE_TOPPINGS_EXPR.format(pid="NEW.product_id")}
+        WHERE rowid = NEW.product_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_pt_ad AFTER DELETE ON pizza_toppings BEGIN
+        UPDATE products_fts SET toppings = {_SQLITE_TOPPINGS_EXPR.format(pid="OLD.product_id")}
+        WHERE rowid = OLD.product_id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_t_au AFTER UPDATE OF name ON toppings BEGIN
+        UPDATE products_fts SET toppings = {_SQLITE_TOPPINGS_EXPR.format(pid="products_fts.rowid")}
+        WHERE rowid IN (SELECT product_id FROM pizza_toppings WHERE topping_id = NEW.id);
+    END""",
+]
+
+_SQLITE_REBUILD = [
+    "DELETE FROM products_fts",
+    f"""INSERT INTO products_fts(rowid, name, description, toppings)
+        SELECT p.id, p.name, COALESCE(p.description, ''), {_SQLITE_TOPPINGS_EXPR.format(pid="p.id")}
+        FROM products p""",
+]
+
+_PG_TOPPINGS_EXPR = """COALESCE((
+    SELECT string_agg(t.name, ' ') FROM pizza_toppings pt
+    JOIN toppings t ON t.id = pt.topping_id WHERE pt.product_id = {pid}
+), '')"""
+
+_PG_VECTOR_EXPR = (
+    "setweight(to_tsvector('simple', COALESCE({name}, '')), 'A') || "
+    "setweight(to_tsvector('simple', COALESCE({description}, '')), 'C') || "
+    "setweight(to_tsvector('simple', {toppings}), 'B')"
+)
+
+_PG_DDL = [
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    "CREATE INDEX IF NOT EXISTS ix_products_search_vector ON products USING GIN (search_vector)",
+    f"""CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {_PG_VECTOR_EXPR.format(
+            name="NEW.name", description="NEW.description", toppings=_PG_TOPPINGS_EXPR.format(pid="NEW.id"))};
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS products_search_vector_trg ON products",
+    """CREATE TRIGGER products_search_vector_trg BEFORE INSERT OR UPDATE OF name, description ON products
+        FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()""",
+    """CREATE OR REPLACE FUNCTION products_search_vector_touch() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            UPDATE products SET name = name WHERE id = OLD.product_id;
+        ELSE
+            UPDATE products SET name = name WHERE id = NEW.product_id;
+        END IF;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS pizza_toppings_search_trg ON pizza_toppings",
+    """CREATE TRIGGER pizza_toppings_search_trg AFTER INSERT OR DELETE ON pizza_toppings
+        FOR EACH ROW EXECUTE FUNCTION products_search_vector_touch()""",
+    """CREATE OR REPLACE FUNCTION toppings_search_vector_touch() RETURNS trigger AS $$
+    BEGIN
+        UPDATE products SET name = name
+        WHERE id IN (SELECT product_id FROM pizza_toppings WHERE topping_id = NEW.id);
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS toppings_search_trg ON toppings",
+    """CREATE TRIGGER toppings_search_trg AFTER UPDATE OF name ON toppings
+        FOR EACH ROW EXECUTE FUNCTION toppings_search_vector_touch()""",
+    "UPDATE products SET name = name WHERE search_vector IS NULL",
+]
+
+
+def init_product_search(conn: Connection) -> None:
+    """Create the search index and its sync triggers (idempotent); backfill if newly created."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        existed = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='products_fts'"
+        )).scalar() is not None
+        try:
+            for stmt in _SQLITE_DDL:
+                conn.execute(text(stmt))
+        except OperationalError:
+            conn.rollback()  # SQLite built without FTS5: search falls back to LIKE
+            return
+        if not existed:
+            for stmt in _SQLITE_REBUILD:
+                conn.execute(text(stmt))
+        conn.commit()
+    elif dialect == "postgresql":
+        for stmt in _PG_DDL:
+            conn.execute(text(stmt))
+        conn.commit()
+
+
+def _sqlite_match_query(q: str) -> str | None:
+    """Every word must match, last word as a prefix (search-as-you-type)."""
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return " ".join(terms)
+
+
+def _pg_tsquery(q: str) -> str | None:
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    return " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"])
+
+
+def search_product_ids(db: Session, q: str, limit: int = 20) -> list[int]:
+    """Ranked product search. Returns product ids, best match first."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = _sqlite_match_query(q)
+        if match is None:
+            return []
+        try:
+            rows = db.execute(
+                text(
+                    "SELECT rowid FROM products_fts WHERE products_fts MATCH :match "
+                    "ORDER BY bm25(products_fts, :w_name, :w_desc, :w_top) LIMIT :limit"
+                ),
+                {"match": match, "w_name": SEARCH_WEIGHTS[0], "w_desc": SEARCH_WEIGHTS[1],
+                 "w_top": SEARCH_WEIGHTS[2], "limit": limit},
+            ).all()
+        except OperationalError:
+            db.rollback()
+            return _search_like(db, q, limit)
+        return [r[0] for r in rows]
+    if dialect == "postgresql":
+        tsquery = _pg_tsquery(q)
+        if tsquery is None:
+            return []
+        rows = db.execute(
+            text(
+                "SELECT id FROM products WHERE search_vector @@ to_tsquery('simple', :q) "
+                "ORDER BY ts_rank(search_vector, to_tsquery('simple', :q)) DESC, id LIMIT :limit"
+            ),
+            {"q": tsquery, "limit": limit},
+        ).all()
+        return [r[0] for r in rows]
+    return _search_like(db, q, limit)
+
+
+def _search_like(db: Session, q: str, limit: int) -> list[int]:
+    term = f"%{q.strip()}%"
+    rows = (
+        db.query(Product.id)
+        .filter(or_(Product.name.ilike(term), Product.description.ilike(term)))
+        .order_by(Product.name)
+        .limit(limit)
+        .all()
+    )
+    return [r[0] for r in rows]
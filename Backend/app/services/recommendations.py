@@ -0,0 +1,92 @@
+"""
+"Frequently ordered together": product x product co-occurrence counts from order history.
+
+Counts are sparse: product id -> {co-ordered product id: count}, holding only pairs that have
+actually been ordered together, so memory grows with distinct pairs rather than products
+squared and a new product costs nothing until it is ordered. Built at startup with one
+streamed pass over orders, then updated incrementally as orders are created. Top-k per product
+is cached and only recomputed for rows touched since.
+"""
+import heapq
+import threading
+from itertools import combinations
+
+from sqlalchemy.orm import Session
+
+from ..models import Order
+
+BUILD_CHUNK_ORDERS = 2000
+DEFAULT_TOP_K = 5
+
+
+def order_product_ids(order_data: dict | None) -> set[int]:
+    """Distinct product ids in an order_data blob (custom pizzas have no product id and are skipped)."""
+    ids = set()
+    if order_data and isinstance(order_data, dict):
+        for row in order_data.get("items") or []:
+            if isinstance(row, dict) and isinstance(row.get("product_id"), int):
+                ids.add(row["product_id"])
+    return ids
+
+
+class CoOccurrence:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pairs: dict[int, dict[int, int]] = {}
+        self._top: dict[int, tuple[int, list[int]]] = {}
+        self.orders_seen = 0
+
+    def _add_order(self, ids: set[int]) -> None:
+        """Count every unordered pair of the order's products (both directions of the row map)."""
+        for a, b in combinations(sorted(ids), 2):
+            row_a = self._pairs.setdefault(a, {})
+            row_a[b] = row_a.get(b, 0) + 1
+            row_b = self._pairs.setdefault(b, {})
+            row_b[a] = row_b.get(a, 0) + 1
+
+    def rebuild(self, db: Session) -> None:
+        """Recompute counts from all orders, streamed BUILD_CHUNK_ORDERS rows at a time."""
+        with self._lock:
+            self._pairs = {}
+            self._top = {}
+            self.orders_seen = 0
+            for (order_data,) in db.query(Order.order_data).yield_per(BUILD_CHUNK_ORDERS):
+                ids = order_product_ids(order_data)
+                self.orders_seen += 1
+                if len(ids) > 1:
+                    self._add_order(ids)
+
+    def record_order(self, product_ids) -> None:
+        """Incrementally add one order's product set."""
+        ids = set(product_ids)
+        with self._lock:
+            self.orders_seen += 1
+            if len(ids) < 2:
+                return
+            self._add_order(ids)
+            for pid in ids:
+                self._top.pop(pid, None)
+
+    def top(self, product_id: int, k: int = DEFAULT_TOP_K) -> list[int]:
+        """Up to k product ids most often ordered with product_id, most frequent first."""
+        cached = self._top.get(product_id)
+        if cached is not None and cached[0] >= k:
+            return cached[1][:k]
+        with self._lock:
+            row = self._pairs.get(product_id)
+            if not row:
+                return []
+            result = [pid for pid, _ in heapq.nsmallest(k, row.items(), key=lambda item: (-item[1], item[0]))]
+            self._top[product_id] = (k, result)
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "products": len(self._pairs),
+                "orders_seen": self.orders_seen,
+                "pairs": sum(len(row) for row in self._pairs.values()) // 2,
+            }
+
+
+recommender = CoOccurrence()
@@ -1,6 +1,6 @@
 """Seed database only if tables are empty."""
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select, update
 from ..database import SessionLocal, init_db
 from ..models import Category, Product, Topping, PizzaTopping, Location, Store
 
@@ -311,32 +311,16 @@ def seed_stores_from_locations(db: Session) -> None:
     """Copy data from locations table to stores table; set is_active=True. Link each location to its store."""
     if _count(db, Store) > 0:
         
-        locations = db.query(Location).filter(Location.store_id.is_(None)).all()
-        stores = db.query(Store).all()
-        
-        def normalize_store_name(name: str) -> str:
-            """Normalize store name for matching."""
-            if not name:
-                return ""
-            normalized = ' '.join(name.strip().upper().split())
-            normalized = normalized.replace(' - ', '-').replace(' -', '-').replace('- ', '-')
-            return normalized
-        
-        for loc in locations:
-            if not loc.store_name:
-                continue
-            loc_name_clean = normalize_store_name(loc.store_name)
-            
-          
-            for store in stores:
-                if not store.name:
-                    continue
-                store_name_clean = normalize_store_name(store.name)
-                
-                if loc_name_clean == store_name_clean or loc_name_clean in store_name_clean or store_name_clean in loc_name_clean:
-                    loc.store_id = store.id
-                    break
-        
+        matching_store = (
+            select(func.min(Store.id))
+            .where(Store.name_normalized == Location.store_name_normalized)
+            .scalar_subquery()
+        )
+        db.execute(
+            update(Location)
+            .where(Location.store_id.is_(None), Location.store_name_normalized != "")
+            .values(store_id=matching_store)
+        )
         db.commit()
         return
     
@@ -0,0 +1,98 @@
+"""
+Resolved per-store menu: store x product availability and price, precomputed into a dense matrix.
+
+Columns are products (index by product id), rows are stores that have overrides; every other
+store shares the default row (all available, base_price). Rebuilt when the menu cache version
+moves or, like menu cache entries, after MENU_CACHE_TTL_SECONDS (which bounds overrides written
+by other processes), so per-request lookups are plain list indexing with no joins.
+"""
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from ..models import Product, StoreProduct
+from .menu_cache import menu_cache
+
+
+class StoreMenuMatrix:
+    def __init__(self, version: int, product_ids: list[int], base_prices: list[float]):
+        self.version = version
+        self.expires_at = time.monotonic() + menu_cache.ttl_seconds
+        self.columns: dict[int, int] = {pid: i for i, pid in enumerate(product_ids)}
+        self.default_available = bytearray(b"\x01" * len(product_ids))
+        self.default_prices = list(base_prices)
+        self.rows: dict[int, tuple[bytearray, list[float]]] = {}
+
+    def _row(self, store_id: int | None) -> tuple[bytearray, list[float]]:
+        if store_id is None:
+            return self.default_available, self.default_prices
+        return self.rows.get(store_id, (self.default_available, self.default_prices))
+
+    def set_override(self, store_id: int, product_id: int, is_available: bool, price_override: float | None) -> None:
+        col = self.columns.get(product_id)
+        if col is None:
+            return
+        row = self.rows.get(store_id)
+        if row is None:
+            row = (bytearray(self.default_available), list(self.default_prices))
+            self.rows[store_id] = row
+        row[0][col] = 1 if is_available else 0
+        if price_override is not None:
+            row[1][col] = float(price_override)
+
+    def is_available(self, store_id: int | None, product_id: int) -> bool:
+        col = self.columns.get(product_id)
+        if col is None:
+            return False
+        return bool(self._row(store_id)[0][col])
+
+    def price(self, store_id: int | None, product_id: int) -> float | None:
+        """Resolved price for store, or None if the product is unknown."""
+        col = self.columns.get(product_id)
+        if col is None:
+            return None
+        return self._row(store_id)[1][col]
+
+
+def _is_current(matrix: StoreMenuMatrix | None) -> bool:
+    return matrix is not None and matrix.version == menu_cache.version and matrix.expires_at > time.monotonic()
+
+
+class StoreMenu:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matrix: StoreMenuMatrix | None = None
+
+    def matrix(self, db: Session) -> StoreMenuMatrix:
+        """Current matrix; rebuilt (two queries) if the menu changed since it was built or it expired."""
+        matrix = self._matrix
+        if _is_current(matrix):
+            return matrix
+        with self._lock:
+            matrix = self._matrix
+            if not _is_current(matrix):
+                matrix = self._load(db)
+                self._matrix = matrix
+        return matrix
+
+    def _load(self, db: Session) -> StoreMenuMatrix:
+        version = menu_cache.version
+        products = db.query(Product.id, Product.base_price).order_by(Product.id).all()
+        matrix = StoreMenuMatrix(
+            version,
+            [pid for pid, _ in products],
+            [float(price or 0.0) for _, price in products],
+        )
+        overrides = db.query(
+            StoreProduct.store_id,
+            StoreProduct.product_id,
+            StoreProduct.is_available,
+            StoreProduct.price_override,
+        ).all()
+        for store_id, product_id, is_available, price_override in overrides:
+            matrix.set_override(store_id, product_id, bool(is_available), price_override)
+        return matrix
+
+
+store_menu = StoreMenu()
@@ -0,0 +1,136 @@
+"""
+Token-bucket throttling for login endpoints.
+
+Every attempt takes one token from the client's bucket and one from the account's bucket
+(email, or store id for login-by-store) before any bcrypt work is scheduled. An empty bucket
+raises LoginThrottled (mapped to 429 + Retry-After in main), so a rejected attempt costs a dict
+lookup, never a hash round. Behind a reverse proxy the client address comes from a configured
+forwarded-for header (see client_of); without one every user shares the proxy's bucket.
+Buckets live in a ThrottleBackend; MemoryBackend is per-process, a shared backend (e.g. Redis)
+can be plugged in with the same take/reset interface.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from .config import (
+    LOGIN_THROTTLE_ACCOUNT_BURST,
+    LOGIN_THROTTLE_ACCOUNT_PER_MINUTE,
+    LOGIN_THROTTLE_CLIENT_BURST,
+    LOGIN_THROTTLE_CLIENT_IP_HEADER,
+    LOGIN_THROTTLE_CLIENT_PER_MINUTE,
+    LOGIN_THROTTLE_MAX_KEYS,
+    LOGIN_THROTTLE_TRUSTED_PROXY_HOPS,
+)
+
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Too many login attempts, retry later")
+        self.retry_after = retry_after
+
+
+class ThrottleBackend(Protocol):
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until a token is available."""
+
+    def reset(self, key: str) -> None:
+        """Refill the bucket (e.g. after a successful login)."""
+
+
+class MemoryBackend:
+    """In-process buckets in a bounded LRU. Evicting an idle bucket only forgets a (nearly) full bucket."""
+
+    def __init__(self, max_keys: int = LOGIN_THROTTLE_MAX_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, capacity: int, refill_per_second: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(capacity), now))
+            tokens = min(float(capacity), tokens + (now - updated) * refill_per_second)
+            if tokens >= 1.0:
+                self._buckets[key] = (tokens - 1.0, now)
+                retry_after = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                retry_after = (1.0 - tokens) / refill_per_second if refill_per_second > 0 else math.inf
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def client_of(request) -> str | None:
+    """
+    Client address for the per-client bucket. With LOGIN_THROTTLE_CLIENT_IP_HEADER set (app behind
+    a reverse proxy), the address LOGIN_THROTTLE_TRUSTED_PROXY_HOPS entries from the right of that
+    header: the one our own outermost proxy saw, which the client cannot spoof. Otherwise the
+    direct peer address.
+    """
+    if LOGIN_THROTTLE_CLIENT_IP_HEADER:
+        forwarded = [part.strip() for part in request.headers.get(LOGIN_THROTTLE_CLIENT_IP_HEADER, "").split(",")]
+        forwarded = [part for part in forwarded if part]
+        if len(forwarded) >= LOGIN_THROTTLE_TRUSTED_PROXY_HOPS > 0:
+            return forwarded[-LOGIN_THROTTLE_TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else None
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        backend: ThrottleBackend,
+        account_burst: int = LOGIN_THROTTLE_ACCOUNT_BURST,
+        account_per_minute: float = LOGIN_THROTTLE_ACCOUNT_PER_MINUTE,
+        client_burst: int = LOGIN_THROTTLE_CLIENT_BURST,
+        client_per_minute: float = LOGIN_THROTTLE_CLIENT_PER_MINUTE,
+    ):
+        self.backend = backend
+        self.account_burst = account_burst
+        self.account_rate = account_per_minute / 60.0
+        self.client_burst = client_burst
+        self.client_rate = client_per_minute / 60.0
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def check(self, scope: str, account: str, client: str | None) -> None:
+        """Charge one attempt to the client and the account; raise LoginThrottled if either bucket is empty."""
+        retry_after = 0.0
+        if client:
+            retry_after = self.backend.take(f"client:{client}", self.client_burst, self.client_rate)
+        if not retry_after:
+            key = f"{scope}:{account.strip().lower()}"
+            retry_after = self.backend.take(key, self.account_burst, self.account_rate)
+        with self._lock:
+            if retry_after:
+                self.rejected += 1
+            else:
+                self.allowed += 1
+        if retry_after:
+            raise LoginThrottled(retry_after)
+
+    def succeeded(self, scope: str, account: str) -> None:
+        """A correct password refills the account bucket; the client bucket keeps draining."""
+        self.backend.reset(f"{scope}:{account.strip().lower()}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"allowed": self.allowed, "rejected": self.rejected}
+        if isinstance(self.backend, MemoryBackend):
+            stats["buckets"] = len(self.backend)
+        return stats
+
+
+login_throttle = LoginThrottle(MemoryBackend())
@@ -0,0 +1,58 @@
+"""
+Bounded LRU of verified JWTs -> decoded claims.
+
+A hit skips signature verification entirely; entries are honoured only until the token's
+own exp claim, so caching never extends a token's lifetime. Invalid tokens are not cached.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from .config import TOKEN_CACHE_SIZE
+
+
+class TokenCache:
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            exp, claims = entry
+            if exp <= time.time():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def put(self, token: str, exp: float | int | None, claims: Any) -> None:
+        """Cache claims until exp (epoch seconds). Tokens without exp are not cached."""
+        if exp is None or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (float(exp), claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
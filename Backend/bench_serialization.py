@@ -0,0 +1,87 @@
+"""Benchmark list serialization: per-row model_validate + FastAPI encoding vs the batch path (app.serialization).
+
+Usage: python bench_serialization.py [rows]   (default 10000, in-memory SQLite)
+"""
+import json
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Category, Product
+from app.schemas import ProductOut
+from app.serialization import schema_columns, dump_rows, dump_models
+
+
+def _seed(db, rows: int) -> None:
+    cat = Category(name="Bench")
+    db.add(cat)
+    db.flush()
+    db.add_all(
+        Product(
+            name=f"Product {i}",
+            description="A reasonably long description for a menu item " * 3,
+            size='12" Medium',
+            sauce="Tomato Sauce",
+            image="🍕",
+            category_id=cat.id,
+            type="pizza",
+            base_price=9.99,
+        )
+        for i in range(rows)
+    )
+    db.commit()
+
+
+def _per_row(db) -> bytes:
+    """What list endpoints did before: model_validate per ORM row, then FastAPI's jsonable_encoder + json.dumps."""
+    rows = db.query(Product).order_by(Product.id).all()
+    out = [ProductOut.model_validate(r) for r in rows]
+    return json.dumps(jsonable_encoder(out)).encode("utf-8")
+
+
+def _list_adapter(db) -> bytes:
+    """Schema objects dumped once through the cached list TypeAdapter."""
+    rows = db.query(Product).order_by(Product.id).all()
+    return dump_models(ProductOut, [ProductOut.model_validate(r) for r in rows])
+
+
+def _direct_rows(db) -> bytes:
+    """Column select mapped straight to dicts and encoded once."""
+    stmt = select(*schema_columns(Product, ProductOut)).order_by(Product.id)
+    return dump_rows(db.execute(stmt).mappings())
+
+
+def _time(fn, db, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        fn(db)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    _seed(db, rows)
+
+    assert json.loads(_per_row(db)) == json.loads(_direct_rows(db)) == json.loads(_list_adapter(db))
+    print(f"{rows} rows, best of 5")
+    for label, fn in (
+        ("per-row model_validate + jsonable_encoder", _per_row),
+        ("list TypeAdapter dump_json", _list_adapter),
+        ("direct row-to-dict + to_json", _direct_rows),
+    ):
+        seconds = _time(fn, db)
+        print(f"  {label:<44} {seconds * 1000:8.1f} ms  {seconds / rows * 1e6:6.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Microbenchmark: JWT verification with and without the verified-token LRU (app.token_cache).
+
+Usage: python bench_token_cache.py [iterations]   (default 20000)
+"""
+import sys
+import time
+
+from app.auth import create_admin_access_token, decode_admin_token, admin_token_cache
+from app.services.auth_service import create_access_token, decode_access_token, user_token_cache
+
+
+def _per_call(fn, token: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(token)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    cases = (
+        ("user  (decode_access_token)", decode_access_token, create_access_token(42), user_token_cache),
+        ("admin (decode_admin_token) ", decode_admin_token, create_admin_access_token(7, 3), admin_token_cache),
+    )
+    print(f"{iterations} verifications of one token")
+    for label, fn, token, cache in cases:
+        cache.maxsize = 0  # disables caching: every call does a full jwt.decode
+        cache.clear()
+        uncached = _per_call(fn, token, iterations)
+        cache.maxsize = 10_000
+        fn(token)
+        cached = _per_call(fn, token, iterations)
+        print(f"  {label}  uncached {uncached * 1e6:7.2f} us   cached {cached * 1e6:6.2f} us   x{uncached / cached:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Statement-count check for cart line upserts: adding a line must be one round trip to cart_items.
+
+Runs the app in-process against a scratch SQLite database, counts the INSERT/UPDATE statements
+that hit cart_items during POST /cart/add (new line, then the identical line again, which must
+merge) and POST /cart/items (a batch: one multi-row statement), and checks the merged quantities.
+Reads done to render the response are not counted. The portable SELECT-then-UPDATE/INSERT
+fallback for dialects without ON CONFLICT is exercised too; it may write once per line.
+
+Usage: python check_cart_upsert.py    (exit status 1 on failure)
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'upsert.db')}"
+os.environ["MENU_BUNDLE_DIR"] = os.path.join(_tmp.name, "menu")
+os.environ["CART_SWEEP_INTERVAL_SECONDS"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import cart_lines  # noqa: E402
+
+# (label, request path, body)
+ADDS = [
+    ("add new line", "/cart/add", {"product_id": 2, "quantity": 1}),
+    ("add identical line", "/cart/add", {"product_id": 2, "quantity": 2}),
+    (
+        "add custom pizza",
+        "/cart/add",
+        {"quantity": 1, "custom_data": {"name": "Build Your Own", "meats": [{"name": "Beef"}]}},
+    ),
+    (
+        "add batch of 3",
+        "/cart/items",
+        [{"product_id": 3, "quantity": 1}, {"product_id": 4, "quantity": 1}, {"product_id": 2, "quantity": 1}],
+    ),
+]
+EXPECTED_QUANTITIES = {2: 4, 3: 1, 4: 1, None: 1}
+
+
+class StatementCounter:
+    def __init__(self, table: str):
+        self.table = table
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        verb = statement.split()[0].upper()
+        if verb in ("INSERT", "UPDATE") and self.table in statement:
+            self.statements.append(verb)
+
+    def take(self) -> list[str]:
+        taken, self.statements = self.statements, []
+        return taken
+
+
+def _quantities(client: TestClient, headers: dict) -> dict:
+    return {i["product_id"]: i["quantity"] for i in client.get("/cart", headers=headers).json()["items"]}
+
+
+def main() -> int:
+    failures = []
+    counter = StatementCounter("cart_items")
+    with TestClient(app) as client:
+        client.post("/auth/signup", json={"name": "Check", "email": "upsert@example.com", "password": "check-password"})
+        token = client.post("/auth/login", json={"email": "upsert@example.com", "password": "check-password"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        client.get("/cart", headers=headers)  # creates the cart outside the measured requests
+
+        def run(mode: str, label: str, path: str, body) -> None:
+            lines = len(body) if isinstance(body, list) else 1
+            allowed = 1 if mode == "native" else lines
+            event.listen(engine, "before_cursor_execute", counter)
+            try:
+                r = client.post(path, headers=headers, json=body)
+            finally:
+                event.remove(engine, "before_cursor_execute", counter)
+            writes = counter.take()
+            ok = r.status_code == 200 and 0 < len(writes) <= allowed
+            print(f"{'ok  ' if ok else 'FAIL'} {mode:<8} {label:<20} status={r.status_code} cart_items writes={writes}")
+            if not ok:
+                failures.append(f"{mode}: {label}")
+
+        def check_quantities(mode: str) -> None:
+            quantities = _quantities(client, headers)
+            if quantities != EXPECTED_QUANTITIES:
+                failures.append(f"{mode}: merged quantities {quantities} != {EXPECTED_QUANTITIES}")
+
+        for label, path, body in ADDS:
+            run("native", label, path, body)
+        check_quantities("native")
+
+        client.delete("/cart/clear", headers=headers)
+        native = cart_lines._dialect_insert
+        cart_lines._dialect_insert = lambda db: (None, None)  # as on a dialect without ON CONFLICT
+        try:
+            for label, path, body in ADDS:
+                run("portable", label, path, body)
+            check_quantities("portable")
+        finally:
+            cart_lines._dialect_insert = native
+
+    print("FAIL: " + ", ".join(failures) if failures else "ok")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
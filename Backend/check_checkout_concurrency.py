@@ -0,0 +1,87 @@
+"""Concurrency check for checkout: parallel duplicate submissions must create exactly one order.
+
+Runs the app in-process against a scratch SQLite database and fires the same checkout from
+several threads at once, first with a shared Idempotency-Key (every caller must get the same
+CheckoutOut), then without a key (one caller wins, the rest get 409/400).
+
+Usage: python check_checkout_concurrency.py [parallel]   (default 8, exit status 1 on failure)
+"""
+import os
+import sys
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'checkout.db')}"
+os.environ["MENU_BUNDLE_DIR"] = os.path.join(_tmp.name, "menu")
+os.environ["CART_SWEEP_INTERVAL_SECONDS"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Order, Store  # noqa: E402
+
+DELIVERY = {"name": "Check", "email": "check@example.com", "phone": "1", "address": "1 Main St", "city": "X", "zipCode": "1"}
+
+
+def _fill_cart(client: TestClient, headers: dict) -> None:
+    r = client.post("/cart/items", headers=headers, json=[{"product_id": 2, "quantity": 1}, {"product_id": 3, "quantity": 2}])
+    assert r.status_code == 200, r.text
+
+
+def _order_count() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Order).count()
+    finally:
+        db.close()
+
+
+def main() -> int:
+    parallel = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    failures = []
+    with TestClient(app) as client:
+        client.post("/auth/signup", json={"name": "Check", "email": DELIVERY["email"], "password": "check-password"})
+        token = client.post("/auth/login", json={"email": DELIVERY["email"], "password": "check-password"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        db = SessionLocal()
+        body = {**DELIVERY, "store_id": db.query(Store).first().id}
+        db.close()
+
+        def checkout(extra_headers: dict):
+            r = client.post("/orders/checkout", headers={**headers, **extra_headers}, json=body)
+            return r.status_code, r.json()
+
+        _fill_cart(client, headers)
+        before = _order_count()
+        key = {"Idempotency-Key": str(uuid.uuid4())}
+        with ThreadPoolExecutor(parallel) as pool:
+            results = list(pool.map(lambda _: checkout(key), range(parallel)))
+        statuses = sorted(status for status, _ in results)
+        bodies = {tuple(sorted(b.items())) for status, b in results if status == 200}
+        created = _order_count() - before
+        print(f"same Idempotency-Key x{parallel}: statuses={statuses} distinct responses={len(bodies)} orders created={created}")
+        if statuses != [200] * parallel or len(bodies) != 1 or created != 1:
+            failures.append("idempotent checkout")
+        status, replay = checkout(key)
+        if status != 200 or tuple(sorted(replay.items())) not in bodies or _order_count() - before != 1:
+            failures.append("idempotent replay")
+
+        _fill_cart(client, headers)
+        before = _order_count()
+        with ThreadPoolExecutor(parallel) as pool:
+            results = list(pool.map(lambda _: checkout({}), range(parallel)))
+        statuses = sorted(status for status, _ in results)
+        created = _order_count() - before
+        print(f"no key x{parallel}: statuses={statuses} orders created={created}")
+        if statuses.count(200) != 1 or created != 1 or any(s not in (200, 400, 409) for s in statuses):
+            failures.append("double-submit without key")
+
+    print("FAIL: " + ", ".join(failures) if failures else "ok")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
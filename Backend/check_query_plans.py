@@ -0,0 +1,102 @@
+"""Query-plan regression check for the hot router queries (SQLite EXPLAIN QUERY PLAN).
+
+Builds a scratch database through init_db (so migrations and index creation are exercised) and
+fails if any listed query scans a whole table, or sorts in a temp B-tree where an index should
+deliver the order.
+
+Usage: python check_query_plans.py    (exit status 1 on regression)
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'plans.db')}"
+
+from sqlalchemy import delete, func, select, text  # noqa: E402
+from sqlalchemy.dialects import sqlite  # noqa: E402
+
+from app.database import engine, init_db  # noqa: E402
+from app.models import Admin, Cart, CartItem, IdempotencyKey, Location, Order, OrderItem, Product, Store, StoreProduct, User  # noqa: E402
+
+# (label, statement, ordered) - ordered queries must not need a temp B-tree sort.
+HOT_QUERIES = [
+    ("auth: user by email", select(User).where(User.email == "a@x.com"), False),
+    ("admin: admin by email", select(Admin).where(Admin.email == "a@x.com"), False),
+    ("admin: admin by store", select(Admin).where(Admin.store_id == 1, Admin.username == "store_1"), False),
+    ("cart: cart by user", select(Cart.id, Cart.version).where(Cart.user_id == 1), False),
+    ("cart: lines of cart", select(CartItem).where(CartItem.cart_id == 1), False),
+    ("cart: line in cart", select(CartItem).where(CartItem.id == 1, CartItem.cart_id == 1), False),
+    ("cart: clear cart", delete(CartItem).where(CartItem.cart_id == 1), False),
+    ("cart: products by id", select(Product).where(Product.id.in_([1, 2, 3])), False),
+    ("orders: history", select(Order).where(Order.user_id == 1).order_by(Order.created_at.desc()), True),
+    ("orders: one order", select(Order).where(Order.id == 1, Order.user_id == 1), False),
+    ("admin: store orders", select(Order).where(Order.store_id == 1).order_by(Order.created_at.desc()), True),
+    (
+        "admin: store orders by status",
+        select(Order).where(Order.store_id == 1, Order.status == "PENDING").order_by(Order.created_at.desc()),
+        True,
+    ),
+    (
+        "orders: lines of orders",
+        select(OrderItem).where(OrderItem.order_id.in_([1, 2])).order_by(OrderItem.order_id, OrderItem.position),
+        True,
+    ),
+    (
+        "reports: units sold by store",
+        select(OrderItem.product_id, func.sum(OrderItem.quantity))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.store_id == 1)
+        .group_by(OrderItem.product_id),
+        False,
+    ),
+    (
+        "reports: units sold of product",
+        select(func.sum(OrderItem.quantity)).where(OrderItem.product_id == 1),
+        False,
+    ),
+    ("admin: store order", select(Order).where(Order.id == 1, Order.store_id == 1), False),
+    ("admin: store menu overrides", select(StoreProduct).where(StoreProduct.store_id == 1), False),
+    (
+        "checkout: store by location name",
+        select(Store).join(Location, Location.store_id == Store.id).where(Location.store_name_normalized == "X"),
+        False,
+    ),
+    ("checkout: store by name", select(Store).where(Store.name_normalized == "X"), False),
+    ("admin: link locations", select(Location.id).where(Location.store_name_normalized == "X"), False),
+    (
+        "sweeper: expired idempotency keys",
+        select(IdempotencyKey.id).where(IdempotencyKey.created_at < "2000-01-01"),
+        False,
+    ),
+    ("payments: order by intent", select(Order).where(Order.payment_intent_id == "pi_1"), False),
+]
+
+
+def _plan(conn, stmt) -> list[str]:
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def _problems(plan: list[str], ordered: bool) -> list[str]:
+    problems = [step for step in plan if step.startswith("SCAN ") and " INDEX " not in step]
+    if ordered:
+        problems += [step for step in plan if "TEMP B-TREE" in step]
+    return problems
+
+
+def main() -> int:
+    init_db()
+    failures = 0
+    with engine.connect() as conn:
+        for label, stmt, ordered in HOT_QUERIES:
+            plan = _plan(conn, stmt)
+            problems = _problems(plan, ordered)
+            failures += bool(problems)
+            print(f"{'FAIL' if problems else 'ok  '} {label:<32} {' | '.join(plan)}")
+    print(f"{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use indexes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())